@@ -0,0 +1,57 @@
+"""
+Builds the columnar nutrition snapshots (see nutrition_snapshot.py) from the
+CSVs, cleaned exactly as the import pipeline cleans them. Rerun after a CSV
+changes; services ignore snapshots older than their CSV.
+
+Run from the backend/ directory:
+
+    python Import_Scripts/build_snapshot.py              # every dataset with a CSV
+    python Import_Scripts/build_snapshot.py nutrition4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/ for shared modules
+from datasets import DATASETS
+from import_pipeline import ChunkCleaner, iter_record_chunks
+from nutrition_snapshot import snapshot_path, write_snapshot
+
+
+def build_snapshot(dataset_name, csv_path=None, chunk_size=5000):
+    dataset = DATASETS[dataset_name]
+    csv_path = csv_path or dataset["csv"]
+    cleaner = ChunkCleaner(dataset)
+
+    started = time.perf_counter()
+    records = [record for chunk in iter_record_chunks(csv_path, cleaner, chunk_size) for record in chunk]
+    numeric = {col: np.array([r[col] for r in records], dtype=np.float32) for col in cleaner.numeric_columns}
+    text = {col: [str(r[col]).strip() for r in records]
+            for col in cleaner.columns if col not in set(cleaner.numeric_columns)}
+
+    schema = write_snapshot(dataset_name, csv_path, numeric, text)
+    print(f"[build_snapshot] {dataset_name}: {schema['rows']} rows, {len(numeric)} numeric and "
+          f"{len(text)} text columns -> {snapshot_path(dataset_name)} ({time.perf_counter() - started:.2f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build memory-mapped snapshots of the nutrition CSVs.")
+    parser.add_argument("datasets", nargs="*", help=f"datasets to build: {', '.join(DATASETS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(unknown)}")
+
+    for name in args.datasets or list(DATASETS):
+        if not os.path.exists(DATASETS[name]["csv"]):
+            print(f"[build_snapshot] Skipping {name}: {DATASETS[name]['csv']} not found")
+            continue
+        build_snapshot(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Schema settings for every nutrition dataset the import pipeline knows about.
+
+csv               path relative to backend/
+collection        Weaviate collection (or alias) the rows are uploaded to
+key_columns       columns that identify a row; they seed its deterministic UUID
+rename            columns to rename before anything else
+clean_columns     normalize headers to snake_case property names
+text_columns      columns kept as TEXT; every other column is coerced to NUMBER
+numeric_columns   alternatively, the explicit list of NUMBER columns
+descriptions      property descriptions shown to the generative model
+"""
+
+DATASETS = {
+    "nutrition": {
+        "csv": "data/nutrition.csv",
+        "collection": "FoodNutrition",
+        "key_columns": ["name", "serving_size"],
+        # Column types are inferred from the data
+        "descriptions": {
+            "name": "Name of the food item",
+            "serving_size": "Standard serving size of the food item",
+            "calories": "Total calories in the serving size",
+            "total_fat": "Total fat content (g)",
+            "saturated_fat": "Saturated fat content (g)",
+            "cholesterol": "Cholesterol content (mg)",
+            "sodium": "Sodium content (mg)",
+            "protein": "Protein content (g)",
+            "carbohydrate": "Total carbohydrate content (g)",
+            "fiber": "Dietary fiber content (g)",
+            "sugars": "Total sugars content (g)",
+            "vitamin_c": "Vitamin C content (mg)",
+            "vitamin_d": "Vitamin D content (µg)",
+            "calcium": "Calcium content (mg)",
+            "iron": "Iron content (mg)",
+            "potassium": "Potassium content (mg)",
+            "zink": "Zinc content (mg)",
+            "water": "Water content (g)",
+        },
+    },
+    "nutrition2": {
+        "csv": "data/nutrition2.csv",
+        "collection": "FoodNutrition2",
+        "key_columns": ["food_and_serving", "food_type"],
+        "numeric_columns": [
+            "calories", "caloriesefrom_fat", "total_fat_g", "total_fat_dv", "sodium_g",
+            "sodium_dv", "potassium_g", "potassium_dv", "total_carbo_hydrate_g",
+            "total_carbo_hydrate_dv", "dietary_fiber_g", "dietary_fiber_dv", "sugars_g",
+            "protein_g", "vitamin_a_dv", "vitamin_c_dv", "calcium_dv", "eeironee_dv",
+            "saturated_fat_dv", "saturated_fat_mg_e", "chole_sterol_dv", "chole_sterol_mg_e"
+        ],
+        "descriptions": {
+            "food_and_serving": "Name and serving size of the food item",
+            "calories": "Total calories",
+            "caloriesefrom_fat": "Calories from fat",
+            "total_fat_g": "Total fat in grams",
+            "total_fat_dv": "Daily value percentage of total fat",
+            "sodium_g": "Sodium in grams",
+            "sodium_dv": "Daily value percentage of sodium",
+            "potassium_g": "Potassium in grams",
+            "potassium_dv": "Daily value percentage of potassium",
+            "total_carbo_hydrate_g": "Total carbohydrates in grams",
+            "total_carbo_hydrate_dv": "Daily value percentage of total carbs",
+            "dietary_fiber_g": "Dietary fiber in grams",
+            "dietary_fiber_dv": "Daily value percentage of dietary fiber",
+            "sugars_g": "Sugar in grams",
+            "protein_g": "Protein in grams",
+            "vitamin_a_dv": "Daily value percentage of Vitamin A",
+            "vitamin_c_dv": "Daily value percentage of Vitamin C",
+            "calcium_dv": "Daily value percentage of Calcium",
+            "eeironee_dv": "Daily value percentage of Iron",
+            "saturated_fat_dv": "Daily value percentage of Saturated Fat",
+            "saturated_fat_mg_e": "Saturated Fat (mg equivalent)",
+            "chole_sterol_dv": "Daily value percentage of Cholesterol",
+            "chole_sterol_mg_e": "Cholesterol (mg equivalent)",
+            "food_type": "Type or category of the food",
+        },
+    },
+    "nutrition3": {
+        "csv": "data/nutrition3.csv",
+        "collection": "FoodNutrition3",
+        "key_columns": ["food", "measure", "category"],
+        "rename": {
+            "Sat.Fat": "sat_fat",
+            "Food": "food",
+            "Measure": "measure",
+            "Grams": "grams",
+            "Calories": "calories",
+            "Protein": "protein",
+            "Fat": "fat",
+            "Fiber": "fiber",
+            "Carbs": "carbs",
+            "Category": "category",
+        },
+        "numeric_columns": [
+            "grams", "calories", "protein", "fat", "sat_fat", "fiber", "carbs"
+        ],
+        "descriptions": {
+            "food": "Name of the food item",
+            "measure": "Serving size measurement",
+            "grams": "Weight in grams",
+            "calories": "Total calories",
+            "protein": "Protein content in grams",
+            "fat": "Total fat in grams",
+            "sat_fat": "Saturated fat in grams",
+            "fiber": "Dietary fiber in grams",
+            "carbs": "Total carbohydrates in grams",
+            "category": "Category or group of the food",
+        },
+    },
+    "nutrition4": {
+        "csv": "data/nutrition4.csv",
+        "collection": "FoodNutrition4",
+        "key_columns": ["food_name", "category_name"],
+        "clean_columns": True,
+        "text_columns": ["food_name", "category_name"],
+        "descriptions": {
+            "food_name": "Name of the food item",
+            "category_name": "Category or group of the food",
+            "calcium": "Amount of calcium in grams",
+            "calories": "Energy content in kilocalories",
+            "carbs": "Total carbohydrate content in grams",
+            "cholesterol": "Cholesterol amount in grams",
+            "copper": "Amount of copper in grams",
+            "fats": "Total fat content in grams",
+            "fiber": "Dietary fiber content in grams",
+            "folate": "Amount of folate in grams",
+            "iron": "Iron content in grams",
+            "magnesium": "Magnesium content in grams",
+            "monounsaturated_fat": "Monounsaturated fat content",
+            "net_carbs": "Net carbohydrates (carbs minus fiber)",
+            "omega_3_dha": "Amount of DHA Omega-3",
+            "omega_3_dpa": "Amount of DPA Omega-3",
+            "omega_3_epa": "Amount of EPA Omega-3",
+            "phosphorus": "Phosphorus content in grams",
+            "polyunsaturated_fat": "Polyunsaturated fat content",
+            "potassium": "Potassium content in grams",
+            "protein": "Protein content in grams",
+            "saturated_fat": "Saturated fat content",
+            "selenium": "Selenium amount",
+            "sodium": "Sodium content in grams",
+            "trans_fat": "Trans fat content",
+            "vitamin_a_iu": "Vitamin A in international units (IU)",
+            "vitamin_a_rae": "Vitamin A in retinol activity equivalents (RAE)",
+            "vitamin_b1": "Thiamine (Vitamin B1) content",
+            "vitamin_b2": "Riboflavin (Vitamin B2) content",
+            "vitamin_b3": "Niacin (Vitamin B3) content",
+            "vitamin_b5": "Pantothenic acid (Vitamin B5) content",
+            "vitamin_b6": "Vitamin B6 content",
+            "vitamin_b12": "Vitamin B12 content",
+            "vitamin_c": "Vitamin C content",
+            "vitamin_d": "Vitamin D content",
+            "vitamin_e": "Vitamin E content",
+            "vitamin_k": "Vitamin K content",
+            "zinc": "Zinc content in grams",
+            "choline": "Choline content",
+            "fructose": "Fructose sugar amount",
+            "histidine": "Amino acid: Histidine",
+            "isoleucine": "Amino acid: Isoleucine",
+            "leucine": "Amino acid: Leucine",
+            "lysine": "Amino acid: Lysine",
+            "methionine": "Amino acid: Methionine",
+            "phenylalanine": "Amino acid: Phenylalanine",
+            "threonine": "Amino acid: Threonine",
+            "tryptophan": "Amino acid: Tryptophan",
+            "valine": "Amino acid: Valine",
+            "starch": "Starch content in grams",
+            "sugar": "Sugar content in grams",
+            "omega_3_ala": "ALA Omega-3 fatty acid",
+            "omega_3_eicosatrienoic_acid": "Omega-3: Eicosatrienoic acid",
+            "omega_6_gamma_linoleic_acid": "Omega-6: Gamma-linolenic acid",
+            "omega_6_dihomo_gamma_linoleic_acid": "Omega-6: Dihomo-gamma-linolenic acid",
+            "omega_6_linoleic_acid": "Omega-6: Linoleic acid",
+            "omega_6_arachidonic_acid": "Omega-6: Arachidonic acid",
+            "omega_6_eicosadienoic_acid": "Omega-6: Eicosadienoic acid",
+        },
+    },
+}
@@ -0,0 +1,638 @@
+"""
+Streaming CSV -> Weaviate import pipeline shared by all nutrition datasets.
+
+Reads the CSV in chunks, cleans and converts each chunk to records in one
+vectorized pass, and uploads them with a configurable batch size and
+concurrency (or Weaviate's dynamic batching), reporting rows/sec as it goes.
+
+Every row gets a deterministic UUID from the dataset's key columns and a
+content hash, so re-imports only send rows that changed:
+
+  shadow    (default) build a new collection, copying unchanged objects with
+            their existing vectors, then atomically point the alias (the
+            dataset's collection name) at it and drop the old one
+  upsert    insert/update/delete changed rows in the live collection
+  recreate  drop and re-upload everything (the old behaviour)
+
+Progress is checkpointed after every chunk; objects Weaviate rejects are
+appended to a dead-letter file before the chunk's checkpoint and retried with
+exponential backoff at the end, so an interrupted import can pick up where it
+stopped with --resume. Each import holds a lease on its collection (a
+heartbeated lock file next to the checkpoint), so a second import of the same
+collection refuses to start.
+
+Run from the backend/ directory:
+
+    python Import_Scripts/import_pipeline.py nutrition4
+    python Import_Scripts/import_pipeline.py nutrition4 --mode upsert
+    python Import_Scripts/import_pipeline.py nutrition4 --resume
+    python Import_Scripts/import_pipeline.py nutrition4 --chunk-size 5000 --batch-size 200 --concurrency 4
+    python Import_Scripts/import_pipeline.py nutrition2 --dynamic
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid as uuid_module
+
+import pandas as pd
+from dotenv import load_dotenv
+import weaviate
+from weaviate.classes.init import Auth
+from weaviate.classes.config import Property, DataType, Configure
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/ for shared modules
+from datasets import DATASETS
+from nutrition_cache import IMPORT_STAMP_DIR, mark_collection_imported
+from local_weaviate import connect_local, local_mode
+
+
+def clean_column_name(col: str) -> str:
+    """'Omega-3 - DHA' -> 'omega_3___dha'; names must start with a letter."""
+    clean = col.strip().lower().replace(" ", "_").replace("(", "").replace(")", "").replace("-", "_")
+    if not clean[0].isalpha():
+        clean = "col_" + clean
+    return clean
+
+
+class ChunkCleaner:
+    """
+    Applies a dataset's schema rules to each DataFrame chunk. Column types are
+    fixed by the first chunk so every chunk is converted the same way.
+    """
+
+    def __init__(self, dataset: dict):
+        self.dataset = dataset
+        self.columns = None
+        self.numeric_columns = None
+
+    def _resolve_schema(self, df):
+        self.columns = list(df.columns)
+        if "numeric_columns" in self.dataset:
+            self.numeric_columns = [col for col in self.dataset["numeric_columns"] if col in df.columns]
+        elif "text_columns" in self.dataset:
+            text = set(self.dataset["text_columns"])
+            self.numeric_columns = [col for col in df.columns if col not in text]
+        else:
+            self.numeric_columns = list(df.select_dtypes(include=["int64", "float64"]).columns)
+
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.columns[0].startswith("Unnamed"):
+            df = df.drop(columns=[df.columns[0]])
+        if self.dataset.get("rename"):
+            df = df.rename(columns=self.dataset["rename"])
+        if self.dataset.get("clean_columns"):
+            df.columns = [clean_column_name(col) for col in df.columns]
+
+        if self.columns is None:
+            self._resolve_schema(df)
+
+        numeric = self.numeric_columns
+        text = [col for col in df.columns if col not in set(numeric)]
+        # Values such as "1,419" would otherwise be coerced to 0
+        unparsed = [col for col in numeric if not pd.api.types.is_numeric_dtype(df[col])]
+        if unparsed:
+            df[unparsed] = df[unparsed].apply(lambda col: col.str.replace(",", "", regex=False))
+        # One pass over all numeric columns instead of a Python loop per column. Always float64,
+        # whatever pandas inferred for this chunk, so content hashes don't depend on the chunking
+        df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce").fillna(0.0).astype("float64")
+        df[text] = df[text].fillna("")
+        return df
+
+    @property
+    def data_types(self):
+        numeric = set(self.numeric_columns)
+        return {col: DataType.NUMBER if col in numeric else DataType.TEXT for col in self.columns}
+
+
+def iter_record_chunks(csv_path, cleaner, chunk_size):
+    """Yields each chunk of the CSV as a list of cleaned record dicts."""
+    with pd.read_csv(csv_path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield cleaner.clean(chunk).to_dict("records")
+
+
+def connect():
+    load_dotenv()
+    if local_mode():
+        return connect_local() # in-process stand-in, see local_weaviate.py
+    client = weaviate.connect_to_weaviate_cloud(
+        cluster_url=os.environ["WEAVIATE_URL"],
+        auth_credentials=Auth.api_key(os.environ["WEAVIATE_API_KEY"]),
+    )
+    assert client.is_ready(), "Weaviate connection failed."
+    return client
+
+
+HASH_PROPERTY = "content_hash"
+IMPORT_MODES = ("shadow", "upsert", "recreate")
+
+# Checkpoints and dead-letter files live next to the import stamps (gitignored)
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 2.0 # seconds; doubled on each attempt
+
+# An import holds a lease on its collection; a lease whose heartbeat is older than this has expired
+LEASE_TIMEOUT = float(os.environ.get("IMPORT_LEASE_TIMEOUT", "60"))
+
+
+def row_identity(record, key_columns, seen):
+    """
+    Deterministic UUID from the key columns; repeated keys within one file get
+    an occurrence suffix so they stay distinct but stable between imports.
+    """
+    key = "|".join(str(record.get(col, "")) for col in key_columns)
+    occurrence = seen.get(key, 0)
+    seen[key] = occurrence + 1
+    if occurrence:
+        key = f"{key}|{occurrence + 1}"
+    return str(generate_uuid5(key))
+
+
+def content_hash(record) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def create_collection(client, collection_name, cleaner, descriptions):
+    if client.collections.exists(collection_name):
+        client.collections.delete(collection_name)
+
+    properties = []
+    for col, data_type in cleaner.data_types.items():
+        properties.append(Property(
+            name=col,
+            data_type=data_type,
+            description=descriptions.get(col, col.replace("_", " ").capitalize())
+        ))
+    properties.append(Property(
+        name=HASH_PROPERTY,
+        data_type=DataType.TEXT,
+        description="Hash of the row contents, used for incremental imports",
+        skip_vectorization=True
+    ))
+
+    client.collections.create(
+        name=collection_name,
+        properties=properties,
+        vectorizer_config=Configure.Vectorizer.text2vec_weaviate(),
+        generative_config=Configure.Generative.google(
+            project_id=os.environ["GOOGLE_PROJECT_ID"],
+            model_id="gemini-2.0-flash-001"
+        )
+    )
+    return client.collections.get(collection_name)
+
+
+def resolve_target(client, name):
+    """Returns the collection an alias points to, the collection itself, or None."""
+    alias = client.alias.get(alias_name=name)
+    if alias is not None:
+        return alias.collection
+    return name if client.collections.exists(name) else None
+
+
+def fetch_hashes(collection):
+    """uuid -> content hash for every object already in the collection."""
+    names = {prop.name for prop in collection.config.get().properties}
+    # Collections from before incremental imports have no hashes: every row counts as changed
+    return_properties = [HASH_PROPERTY] if HASH_PROPERTY in names else []
+    hashes = {}
+    for obj in collection.iterator(return_properties=return_properties):
+        hashes[str(obj.uuid)] = obj.properties.get(HASH_PROPERTY)
+    return hashes
+
+
+def shadow_name(client, collection_name):
+    """Timestamped name for a new shadow collection that never collides with a live one."""
+    base = f"{collection_name}_{time.strftime('%Y%m%d%H%M%S')}"
+    name, n = base, 1
+    while client.collections.exists(name):
+        n += 1
+        name = f"{base}_{n}"
+    return name
+
+
+def swap_alias(client, alias_name, new_target, previous):
+    """Points alias_name at new_target in one call, then drops the previous collection."""
+    if client.alias.get(alias_name=alias_name) is not None:
+        client.alias.update(alias_name=alias_name, new_target_collection=new_target)
+    else:
+        if previous == alias_name:
+            # One-time migration from a plain collection to an alias of the same name
+            print(f"[import] Replacing plain collection '{alias_name}' with an alias (brief gap).")
+            client.collections.delete(alias_name)
+            previous = None
+        client.alias.create(alias_name=alias_name, target_collection=new_target)
+    print(f"[import] Alias '{alias_name}' now points to '{new_target}'.")
+    if previous and previous != new_target:
+        client.collections.delete(previous)
+
+
+def _plain_vector(vector):
+    # Collections without named vectors return {"default": [...]}
+    if isinstance(vector, dict) and list(vector) == ["default"]:
+        return vector["default"]
+    return vector
+
+
+def batch_context(collection, batch_size, concurrency, dynamic):
+    if dynamic:
+        return collection.batch.dynamic()
+    return collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=concurrency)
+
+
+def lease_path(collection_name):
+    return os.path.join(IMPORT_STAMP_DIR, f"{collection_name}.lock")
+
+
+class ImportLease:
+    """
+    Exclusive lease on one collection's import, so two imports never write
+    the same checkpoint or shadow collection.
+
+    The lease is a lock file created with O_EXCL that holds the owner's pid,
+    host and a random token. A heartbeat thread touches it every
+    LEASE_TIMEOUT / 4 seconds; a lease that has not been touched for
+    LEASE_TIMEOUT seconds belongs to a crashed import and may be taken over.
+    """
+
+    def __init__(self, collection_name, timeout=LEASE_TIMEOUT):
+        self.collection_name = collection_name
+        self.timeout = timeout
+        self.path = lease_path(collection_name)
+        self.token = uuid_module.uuid4().hex
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read(self, path=None):
+        try:
+            with open(path or self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _expired(self):
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.timeout
+        except FileNotFoundError:
+            return True
+
+    def _break_expired(self, holder):
+        """Removes an expired lease; puts it back if it turned out to be a fresh one taken meanwhile."""
+        stale = f"{self.path}.{self.token}"
+        try:
+            os.rename(self.path, stale) # only one process can move a given lock file away
+        except FileNotFoundError:
+            return
+        taken = self._read(stale)
+        if holder is not None and taken is not None and taken.get("token") != holder.get("token"):
+            try:
+                os.link(stale, self.path)
+            except FileExistsError:
+                pass
+        os.remove(stale)
+
+    def acquire(self):
+        os.makedirs(IMPORT_STAMP_DIR, exist_ok=True)
+        while True:
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                holder = self._read()
+                if not self._expired():
+                    owner = f"pid {holder['pid']} on {holder['host']}" if holder else "another process"
+                    raise SystemExit(f"Another import of '{self.collection_name}' is running ({owner}); "
+                                     f"if it crashed, retry after {self.timeout:.0f}s.")
+                print(f"[import] Taking over the expired lease on '{self.collection_name}'.")
+                self._break_expired(holder)
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"pid": os.getpid(), "host": socket.gethostname(), "token": self.token}, f)
+            break
+        self._thread = threading.Thread(target=self._heartbeat, name="import-lease", daemon=True)
+        self._thread.start()
+        return self
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.timeout / 4):
+            if not self.held():
+                self.lost = True
+                return
+            os.utime(self.path)
+
+    def held(self):
+        holder = self._read()
+        return holder is not None and holder.get("token") == self.token
+
+    def check(self):
+        """Stops the import if another process took the lease over (e.g. this one was paused too long)."""
+        if self.lost or not self.held():
+            raise SystemExit(f"Lost the import lease on '{self.collection_name}'; another import took over.")
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.held():
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def checkpoint_path(collection_name):
+    return os.path.join(IMPORT_STAMP_DIR, f"{collection_name}.checkpoint.json")
+
+
+def dead_letter_path(collection_name):
+    return os.path.join(IMPORT_STAMP_DIR, f"{collection_name}.failed.jsonl")
+
+
+def load_checkpoint(collection_name):
+    try:
+        with open(checkpoint_path(collection_name)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_checkpoint(collection_name, checkpoint):
+    """Written to a temp file and renamed so a crash never leaves half a checkpoint."""
+    os.makedirs(IMPORT_STAMP_DIR, exist_ok=True)
+    path = checkpoint_path(collection_name)
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
+
+
+def clear_checkpoint(collection_name):
+    for path in (checkpoint_path(collection_name), dead_letter_path(collection_name)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def csv_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {"csv": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_dead_letters(collection_name):
+    try:
+        with open(dead_letter_path(collection_name)) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def write_dead_letters(collection_name, entries):
+    os.makedirs(IMPORT_STAMP_DIR, exist_ok=True)
+    with open(dead_letter_path(collection_name), "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+
+def append_dead_letters(collection_name, entries):
+    os.makedirs(IMPORT_STAMP_DIR, exist_ok=True)
+    with open(dead_letter_path(collection_name), "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def dead_letter_entries(failed_objects):
+    """Turns batch.failed_objects into JSON-friendly entries that can be re-sent."""
+    entries = []
+    for failed in failed_objects:
+        obj = failed.object_
+        entries.append({
+            "uuid": str(obj.uuid),
+            "properties": obj.properties,
+            "vector": obj.vector,
+            "message": failed.message,
+        })
+    return entries
+
+
+def retry_failed(collection, entries, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY):
+    """Re-sends dead-lettered objects with exponential backoff; returns the ones that still fail."""
+    for attempt in range(attempts):
+        if not entries:
+            break
+        delay = base_delay * 2 ** attempt
+        print(f"[import] Retrying {len(entries)} failed objects in {delay:.0f}s (attempt {attempt + 1}/{attempts})")
+        time.sleep(delay)
+        with collection.batch.fixed_size(batch_size=100, concurrent_requests=1) as batch:
+            for entry in entries:
+                batch.add_object(properties=entry["properties"], uuid=entry["uuid"], vector=entry.get("vector"))
+        entries = dead_letter_entries(collection.batch.failed_objects)
+    return entries
+
+
+def run_import(dataset_name, csv_path=None, collection_name=None, chunk_size=1000,
+               batch_size=100, concurrency=2, dynamic=False, max_errors=10, mode="shadow",
+               resume=False):
+    collection_name = collection_name or DATASETS[dataset_name]["collection"]
+    with ImportLease(collection_name) as lease:
+        _run_import(dataset_name, csv_path, collection_name, chunk_size, batch_size, concurrency,
+                    dynamic, max_errors, mode, resume, lease)
+
+
+def _run_import(dataset_name, csv_path, collection_name, chunk_size, batch_size, concurrency,
+                dynamic, max_errors, mode, resume, lease):
+    dataset = DATASETS[dataset_name]
+    csv_path = csv_path or dataset["csv"]
+    key_columns = dataset["key_columns"]
+    cleaner = ChunkCleaner(dataset)
+    descriptions = dataset.get("descriptions", {})
+    signature = {"dataset": dataset_name, "mode": mode, **csv_signature(csv_path)}
+
+    checkpoint = load_checkpoint(collection_name)
+    if resume and checkpoint is None:
+        print("[import] No checkpoint found, starting from the first row.")
+    elif resume and any(checkpoint.get(k) != v for k, v in signature.items()):
+        raise SystemExit("Checkpoint was written for a different CSV, dataset or mode; rerun without --resume.")
+    if not resume:
+        checkpoint = None
+
+    client = connect()
+    try:
+        chunks = iter_record_chunks(csv_path, cleaner, chunk_size)
+        first_chunk = next(chunks, [])
+
+        previous = None if mode == "recreate" else resolve_target(client, collection_name)
+        existing = fetch_hashes(client.collections.get(previous)) if previous else {}
+
+        if checkpoint and client.collections.exists(checkpoint["target"]):
+            target = checkpoint["target"]
+            collection = client.collections.get(target)
+        elif checkpoint:
+            raise SystemExit(f"Checkpointed collection '{checkpoint['target']}' no longer exists; rerun without --resume.")
+        elif mode == "shadow":
+            stale = load_checkpoint(collection_name)
+            if stale and stale["target"] != previous and client.collections.exists(stale["target"]):
+                # We hold the lease, so the run that wrote this checkpoint is no longer active
+                client.collections.delete(stale["target"])
+            target = shadow_name(client, collection_name)
+            collection = create_collection(client, target, cleaner, descriptions)
+        elif mode == "upsert" and previous:
+            target = previous
+            collection = client.collections.get(target)
+        else:
+            target = collection_name
+            collection = create_collection(client, target, cleaner, descriptions)
+
+        if checkpoint:
+            dead_letters = load_dead_letters(collection_name)
+            committed = checkpoint["rows_committed"]
+            inserted, updated = checkpoint["inserted"], checkpoint["updated"]
+            print(f"[import] Resuming '{target}' after row {committed} ({len(dead_letters)} dead-lettered objects).")
+        else:
+            clear_checkpoint(collection_name)
+            dead_letters, committed, inserted, updated = [], 0, 0, 0
+            print(f"[import] Mode '{mode}': writing to '{target}' ({len(existing)} existing objects).")
+        checkpoint = {**signature, "target": target, "rows_committed": committed,
+                      "inserted": inserted, "updated": updated}
+        save_checkpoint(collection_name, checkpoint)
+
+        started = time.perf_counter()
+        rows = 0
+        seen_keys, current_ids, unchanged = {}, set(), set()
+        stopped = False
+        errors = 0
+        for records in _prepend(first_chunk, chunks):
+            objects = []
+            for offset, record in enumerate(records, start=rows):
+                uuid = row_identity(record, key_columns, seen_keys)
+                current_ids.add(uuid)
+                record[HASH_PROPERTY] = content_hash(record)
+                old_hash = existing.get(uuid)
+                if old_hash == record[HASH_PROPERTY]:
+                    unchanged.add(uuid)
+                    continue
+                if offset < committed:
+                    continue # already sent by the interrupted run
+                objects.append((record, uuid))
+                if old_hash is None:
+                    inserted += 1
+                else:
+                    updated += 1
+            rows += len(records)
+
+            if objects:
+                # One batch per chunk: once it exits, every object is stored or in failed_objects
+                with batch_context(collection, batch_size, concurrency, dynamic) as batch:
+                    for record, uuid in objects:
+                        batch.add_object(properties=record, uuid=uuid)
+                failed = dead_letter_entries(collection.batch.failed_objects)
+                # Dead letters are on disk before the checkpoint that skips their rows on --resume
+                append_dead_letters(collection_name, failed)
+                dead_letters += failed
+                errors += len(failed)
+
+            if rows > committed:
+                lease.check()
+                checkpoint.update(rows_committed=rows, inserted=inserted, updated=updated)
+                save_checkpoint(collection_name, checkpoint)
+                elapsed = time.perf_counter() - started
+                print(f"[import] {rows} rows committed ({rows / elapsed:.0f} rows/sec)")
+            if errors > max_errors:
+                print("Too many errors — stopping upload.")
+                stopped = True
+                break
+
+        if mode == "shadow" and unchanged and not stopped:
+            # Reuse stored vectors so unchanged rows are not embedded again
+            with batch_context(collection, batch_size, concurrency, dynamic) as batch:
+                for obj in client.collections.get(previous).iterator(include_vector=True):
+                    if str(obj.uuid) in unchanged:
+                        batch.add_object(properties=obj.properties, uuid=obj.uuid, vector=_plain_vector(obj.vector))
+            failed = dead_letter_entries(collection.batch.failed_objects)
+            append_dead_letters(collection_name, failed)
+            dead_letters += failed
+
+        if stopped:
+            print(f"[import] Stopped after row {checkpoint['rows_committed']}; "
+                  f"{len(dead_letters)} failed objects in {dead_letter_path(collection_name)}. "
+                  f"Fix the cause and rerun with --resume.")
+            return
+
+        dead_letters = retry_failed(collection, dead_letters)
+        write_dead_letters(collection_name, dead_letters)
+
+        deleted = [uuid for uuid in existing if uuid not in current_ids]
+        if mode == "upsert" and deleted:
+            collection.data.delete_many(where=Filter.by_id().contains_any(deleted))
+
+        elapsed = time.perf_counter() - started
+        print(f"[import] {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/sec): "
+              f"{inserted} inserted, {updated} updated, {len(unchanged)} unchanged, {len(deleted)} removed")
+        if dead_letters:
+            print(f"Failed objects: {len(dead_letters)} (see {dead_letter_path(collection_name)}); "
+                  f"rerun with --resume to retry them.")
+            return
+        print("Upload complete!")
+
+        if mode == "shadow":
+            lease.check()
+            swap_alias(client, collection_name, target, previous)
+        clear_checkpoint(collection_name)
+
+        # Tell running services to drop cached lookups for this collection
+        mark_collection_imported(collection_name)
+    except Exception:
+        if os.path.exists(checkpoint_path(collection_name)):
+            print("[import] Import interrupted; rerun with --resume to continue from the last checkpoint.")
+        raise
+    finally:
+        client.close()
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a nutrition CSV into Weaviate.")
+    parser.add_argument("dataset", choices=list(DATASETS), help="dataset settings from datasets.py")
+    parser.add_argument("--csv", default=None, help="override the dataset's CSV path")
+    parser.add_argument("--collection", default=None, help="override the target collection name")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="CSV rows read per chunk")
+    parser.add_argument("--batch-size", type=int, default=100, help="objects per Weaviate batch request")
+    parser.add_argument("--concurrency", type=int, default=2, help="concurrent batch requests")
+    parser.add_argument("--dynamic", action="store_true", help="let Weaviate size batches dynamically")
+    parser.add_argument("--max-errors", type=int, default=10, help="stop after this many failed objects")
+    parser.add_argument("--mode", choices=IMPORT_MODES, default="shadow",
+                        help="shadow: build and swap in a new collection; upsert: update in place; recreate: full re-upload")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted import from its checkpoint and retry dead-lettered objects")
+    args = parser.parse_args(argv)
+
+    run_import(
+        args.dataset,
+        csv_path=args.csv,
+        collection_name=args.collection,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        dynamic=args.dynamic,
+        max_errors=args.max_errors,
+        mode=args.mode,
+        resume=args.resume,
+    )
+
+
+if __name__ == "__main__":
+    main()
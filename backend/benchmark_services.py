@@ -0,0 +1,275 @@
+"""
+Offline latency benchmark for the nutrition and search services.
+
+Runs every service in-process against the local Weaviate/Gemini stand-in
+(local_weaviate.py) with injected latency, drives each endpoint with a fixed
+number of requests from a pool of concurrent clients and writes throughput,
+latency percentiles and the number of Weaviate calls made as JSON:
+
+  food            GET /food on the nutrition API (main.py)
+  get-nutrition   POST /api/get-nutrition on search_scripts/nutrition_search.py
+  search          POST /api/search on search_scripts/search.py
+  import          Import_Scripts/import_pipeline.py, datasets imported side by side,
+                  each dataset's runs one after another
+
+    python benchmark_services.py
+    python benchmark_services.py --scenarios food get-nutrition --requests 500 --concurrency 32
+    python benchmark_services.py --cold-cache --generate-ms 1200 --output services.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BACKEND_DIR, "search_scripts"))
+sys.path.append(os.path.join(BACKEND_DIR, "Import_Scripts"))
+
+SCENARIOS = ("food", "get-nutrition", "search", "import")
+
+# Foods the detector logs (the food classes of the COCO model)
+DEFAULT_FOODS = ["banana", "apple", "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake"]
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return None
+    values = np.asarray(samples_ms)
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p90": round(float(np.percentile(values, 90)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def load_report(samples_ms, statuses, elapsed, calls_before, calls_after):
+    errors = sum(1 for status in statuses if status >= 400)
+    return {
+        "requests": len(samples_ms),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(samples_ms) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": percentiles(samples_ms),
+        "weaviate_calls": {call: calls_after[call] - calls_before.get(call, 0) for call in calls_after},
+    }
+
+
+def run_load(call, requests, concurrency):
+    """Runs call(i) for i in range(requests) on `concurrency` threads; returns (latencies_ms, statuses, elapsed)."""
+    samples, statuses = [], []
+    lock = threading.Lock()
+
+    def timed(i):
+        started = time.perf_counter()
+        status = call(i)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            samples.append(elapsed_ms)
+            statuses.append(status)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(requests)))
+    return samples, statuses, time.perf_counter() - started
+
+
+async def run_async_load(call, requests, concurrency):
+    """Async counterpart of run_load: `concurrency` tasks share the requests."""
+    samples, statuses = [], []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            statuses.append(await call(i))
+            samples.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, statuses, time.perf_counter() - started
+
+
+def bench_food(store, args):
+    import httpx
+    import main
+    from food_log_store import FoodLogStore
+    from nutrition_cache import nutrition_cache
+
+    # Serve a throwaway food log so the benchmark never touches the real one
+    food_log = FoodLogStore(os.path.join(tempfile.mkdtemp(prefix="nutriscan-bench-"), "food_logs.jsonl"), writer=True)
+    for i in range(args.log_entries):
+        food_log.append({"food": args.foods[i % len(args.foods)], "timestamp": datetime.now().isoformat()})
+    main.food_log = food_log
+    main.nutrition_totals.food_log = food_log
+
+    async def run():
+        async with main.lifespan(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                async def call(i):
+                    if args.cold_cache:
+                        nutrition_cache.invalidate()
+                    response = await client.get("/food")
+                    return response.status_code
+
+                await run_async_load(call, args.warmup, args.concurrency)
+                before = dict(store.calls)
+                samples, statuses, elapsed = await run_async_load(call, args.requests, args.concurrency)
+                return load_report(samples, statuses, elapsed, before, store.calls)
+
+    report = asyncio.run(run())
+    report["log_entries"] = args.log_entries
+    return report
+
+
+def _bench_flask(store, args, app, path, payload):
+    from nutrition_cache import nutrition_cache
+
+    def call(i):
+        if args.cold_cache:
+            nutrition_cache.invalidate()
+        response = app.test_client().post(path, json=payload(args.foods[i % len(args.foods)]))
+        return response.status_code
+
+    run_load(call, args.warmup, args.concurrency)
+    before = dict(store.calls)
+    samples, statuses, elapsed = run_load(call, args.requests, args.concurrency)
+    return load_report(samples, statuses, elapsed, before, store.calls)
+
+
+def bench_get_nutrition(store, args):
+    import nutrition_search
+    return _bench_flask(store, args, nutrition_search.app, "/api/get-nutrition", lambda food: {"food_item": food})
+
+
+def bench_search(store, args):
+    import search
+    return _bench_flask(store, args, search.app, "/api/search", lambda food: {"query": f"Nutrition of {food}"})
+
+
+def bench_import(store, args):
+    import import_pipeline
+    import nutrition_cache
+
+    # Checkpoints and import stamps go to a scratch directory
+    scratch = tempfile.mkdtemp(prefix="nutriscan-bench-")
+    import_pipeline.IMPORT_STAMP_DIR = scratch
+    nutrition_cache.IMPORT_STAMP_DIR = scratch
+
+    samples, statuses = [], []
+    lock = threading.Lock()
+
+    def import_dataset(dataset):
+        # Runs of one dataset go one after another: concurrent imports of the same collection aren't supported
+        csv_path = os.path.join(BACKEND_DIR, import_pipeline.DATASETS[dataset]["csv"])
+        for _ in range(args.import_runs):
+            started = time.perf_counter()
+            import_pipeline.run_import(dataset, csv_path=csv_path, batch_size=args.batch_size,
+                                       concurrency=args.import_concurrency, mode=args.import_mode)
+            with lock:
+                samples.append((time.perf_counter() - started) * 1000)
+                statuses.append(200)
+
+    # Different datasets are imported side by side; the importer's progress output is discarded
+    before = dict(store.calls)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=len(args.datasets)) as pool:
+        list(pool.map(import_dataset, args.datasets))
+    elapsed = time.perf_counter() - started
+    report = load_report(samples, statuses, elapsed, before, store.calls)
+    written = report["weaviate_calls"]["objects_written"]
+    report["objects_per_second"] = round(written / elapsed, 1) if elapsed > 0 else None
+    report["datasets"] = args.datasets
+    report["mode"] = args.import_mode
+    return report
+
+
+BENCHMARKS = {
+    "food": bench_food,
+    "get-nutrition": bench_get_nutrition,
+    "search": bench_search,
+    "import": bench_import,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the nutrition and search services offline.")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS, help="what to run (default: all)")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="requests to run before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--foods", default=",".join(DEFAULT_FOODS), help="comma-separated foods requested in turn")
+    parser.add_argument("--cold-cache", action="store_true", help="clear the nutrition cache before every request")
+    parser.add_argument("--log-entries", type=int, default=100, help="food log entries served by /food")
+    parser.add_argument("--no-local-engine", action="store_true",
+                        help="send every /food lookup to Weaviate instead of the local CSV engine first")
+    parser.add_argument("--query-ms", type=float, default=25, help="injected near_text latency")
+    parser.add_argument("--generate-ms", type=float, default=600, help="injected generative latency")
+    parser.add_argument("--batch-ms", type=float, default=40, help="injected latency per import batch request")
+    parser.add_argument("--jitter", type=float, default=0.25, help="relative latency jitter")
+    parser.add_argument("--datasets", default="nutrition2,nutrition3,nutrition4", help="datasets the import scenario loads")
+    parser.add_argument("--import-runs", type=int, default=3, help="imports of each dataset")
+    parser.add_argument("--import-mode", default="shadow", choices=["shadow", "upsert", "recreate"], help="importer --mode")
+    parser.add_argument("--batch-size", type=int, default=100, help="importer --batch-size")
+    parser.add_argument("--import-concurrency", type=int, default=2, help="importer --concurrency")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    args.foods = [food.strip() for food in args.foods.split(",") if food.strip()]
+    args.datasets = list(dict.fromkeys(name.strip() for name in args.datasets.split(",") if name.strip()))
+
+    # The services read these when they are imported and connect
+    os.environ["WEAVIATE_BACKEND"] = "local"
+    os.environ.setdefault("GOOGLE_PROJECT_ID", "local")
+    os.environ.setdefault("GEMINI_API_KEY", "local")
+    os.environ["LOCAL_WEAVIATE_QUERY_MS"] = str(args.query_ms)
+    os.environ["LOCAL_WEAVIATE_GENERATE_MS"] = str(args.generate_ms)
+    os.environ["LOCAL_WEAVIATE_BATCH_MS"] = str(args.batch_ms)
+    os.environ["LOCAL_WEAVIATE_JITTER"] = str(args.jitter)
+    if args.no_local_engine:
+        os.environ["LOCAL_NUTRITION_ENABLED"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # Startup messages from the services go to stderr so stdout stays valid JSON
+    results = {}
+    with contextlib.redirect_stdout(sys.stderr):
+        from local_weaviate import get_local_store
+        from nutrition_cache import nutrition_cache
+        store = get_local_store()
+        for scenario in args.scenarios:
+            nutrition_cache.invalidate() # each scenario starts cold, as its service would
+            results[scenario] = BENCHMARKS[scenario](store, args)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "concurrency": args.concurrency,
+        "cold_cache": args.cold_cache,
+        "local_engine": not args.no_local_engine,
+        "latency": store.latency.to_dict(),
+        "scenarios": results,
+        "platform": {"python": platform.python_version(), "machine": platform.machine()},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Benchmark report written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
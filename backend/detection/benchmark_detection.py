@@ -0,0 +1,140 @@
+"""
+Headless FPS benchmark for the detection pipeline.
+
+Replays a video file, image folder or synthetic frames through the same
+inference, postprocessing and logging code that detect.py uses, without a
+window, and writes per-stage latency percentiles, sustained FPS and peak memory
+as JSON so results can be compared between releases.
+
+    python benchmark_detection.py --source synthetic:300 --profile fast
+    python benchmark_detection.py --source clips/kitchen.mp4 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+# detect.py opens the food log when it is imported: point it at a throwaway file
+# first so the benchmark never creates, migrates or appends to the real one
+os.environ["FOOD_LOG_PATH"] = os.path.join(tempfile.mkdtemp(prefix="nutriscan-bench-"), "food_logs.jsonl")
+
+import detect
+from food_log_store import FoodLogStore
+from frame_sources import open_source
+from inference_profiles import INFERENCE_PROFILES, get_profile
+
+STAGES = ("decode", "inference", "postprocess", "logging")
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return None
+    values = np.asarray(samples_ms)
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p90": round(float(np.percentile(values, 90)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def peak_memory_mb():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_benchmark(source, profile, max_frames=None, warmup=5):
+    cap = open_source(source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open source '{source}'")
+
+    # Each run logs to a fresh store so logged_entries counts only its own detections
+    log_dir = tempfile.mkdtemp(prefix="nutriscan-bench-")
+    detect.food_log = FoodLogStore(os.path.join(log_dir, "food_logs.jsonl"), writer=True)
+
+    model = detect.model.get()
+    predict_kwargs = profile.predict_kwargs(detect.tracked_class_ids)
+    samples = {stage: [] for stage in STAGES}
+    dedup_state = {}
+    frames = 0
+    started = None
+
+    try:
+        while max_frames is None or frames < max_frames + warmup:
+            t0 = time.perf_counter()
+            success, img = cap.read()
+            t1 = time.perf_counter()
+            if not success:
+                break
+
+            measured = frames >= warmup
+            if measured and started is None:
+                started = t0
+            if measured:
+                samples["decode"].append((t1 - t0) * 1000)
+
+            if profile.should_detect(frames):
+                results = list(model(img, stream=True, **predict_kwargs))
+                t2 = time.perf_counter()
+                boxes = detect.extract_boxes(results)
+                t3 = time.perf_counter()
+                detect.log_detections(boxes, dedup_state)
+                t4 = time.perf_counter()
+                if measured:
+                    samples["inference"].append((t2 - t1) * 1000)
+                    samples["postprocess"].append((t3 - t2) * 1000)
+                    samples["logging"].append((t4 - t3) * 1000)
+            frames += 1
+    finally:
+        cap.release()
+
+    measured_frames = max(frames - warmup, 0)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "source": str(source),
+        "profile": profile.to_dict(),
+        "frames": measured_frames,
+        "warmup_frames": min(frames, warmup),
+        "elapsed_seconds": round(elapsed, 3),
+        "fps": round(measured_frames / elapsed, 2) if elapsed > 0 else None,
+        "stages_ms": {stage: percentiles(values) for stage, values in samples.items()},
+        "logged_entries": len(detect.food_log.read_all()),
+        "peak_memory_mb": peak_memory_mb(),
+        "platform": {"python": platform.python_version(), "machine": platform.machine()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the food detector headlessly.")
+    parser.add_argument("--source", default="synthetic:300",
+                        help="video file, image directory, webcam index or synthetic[:N] (default: synthetic:300)")
+    parser.add_argument("--profile", default=None, choices=list(INFERENCE_PROFILES),
+                        help="inference profile (default: DETECTION_PROFILE or 'full')")
+    parser.add_argument("--frames", type=int, default=None, help="stop after this many measured frames")
+    parser.add_argument("--warmup", type=int, default=5, help="frames to run before measuring")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.source, get_profile(args.profile), max_frames=args.frames, warmup=args.warmup)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Benchmark report written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
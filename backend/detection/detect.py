@@ -1,38 +1,77 @@
-from ultralytics import YOLO
 import cv2
-import math 
 import json
 from datetime import datetime
 import os
-from flask import Flask, jsonify, request
+import sys
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-import threading
+import importlib
 import time 
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/ for shared modules
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search_scripts'))
+from food_log_store import FoodLogStore
+from lazy_resource import LazyResource
+from event_bus import EventBus
+from inference_profiles import INFERENCE_PROFILES, get_profile
+from frame_sources import open_source
+from detection_manager import DetectionManager
+from display import Display
+from postprocess import Detections, tracked_mask
+from tracker import TrackTable
+from metrics import SERIALIZE_SECONDS, get_logger, install_flask
+
+log = get_logger("detect")
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app) # Enable CORS for all routes
-
-# Global variables for detection state
-detection_active = False
-detection_thread = None
-camera_open_success = None 
+install_flask(app, "detect") # /metrics and request timing
+
+DEFAULT_CAMERA = "default"
+CAMERA_OPEN_TIMEOUT = 5 # seconds
+
+# Sources /api/start-detection may open besides webcam indices and synthetic frames:
+# video files, image folders or stream URLs, e.g. DETECTION_SOURCES="clips/kitchen.mp4,rtsp://cam1/stream"
+ALLOWED_SOURCES = {source.strip() for source in os.environ.get("DETECTION_SOURCES", "").split(",") if source.strip()}
+
+def validate_source(source):
+    """Returns the source to open if a request may use it; raises ValueError otherwise."""
+    if isinstance(source, bool) or not isinstance(source, (int, str)):
+        raise ValueError("'source' must be a webcam index or a configured source name")
+    if isinstance(source, int) or source.isdigit():
+        if int(source) < 0:
+            raise ValueError("Webcam index must not be negative")
+        return int(source)
+    kind, _, count = source.partition(":")
+    if kind == "synthetic" and (not count or count.isdigit()):
+        return source
+    if source in ALLOWED_SOURCES:
+        return source
+    raise ValueError(f"Source '{source}' is not allowed; add it to DETECTION_SOURCES to replay it")
+
+profile_results = {} # profile name -> stats snapshot from its last run
 
 # Food objects to track
 foods = ["banana"]
 
-# Food logs path
-food_log = os.path.abspath(os.path.join(os.path.dirname(__file__), 'food_logs.json'))
+# Append-only food log (JSON Lines); migrates the old food_logs.json on first use
+food_log = FoodLogStore(writer=True)
+
+# Live detections are pushed to /api/detections/stream subscribers through this bus
+detection_events = EventBus()
+SSE_KEEPALIVE_SECONDS = 15
 
-# Ensure the directory for food_log exists
-os.makedirs(os.path.dirname(food_log), exist_ok=True)
+def load_model():
+    # ultralytics pulls in torch, so even the import waits until the model is needed
+    from ultralytics import YOLO
+    return YOLO("yolo-Weights/yolov8n.pt")
 
-if not os.path.exists(food_log):
-    with open(food_log, "w") as f:
-        json.dump([], f)
+# model, loaded on first use or by the warm-up at startup
+model = LazyResource("yolo", load_model)
 
-# model
-model = YOLO("yolo-Weights/yolov8n.pt")
+# Nutrition search (Weaviate + Gemini), imported on the first /api/get-nutrition request
+nutrition_search = LazyResource("nutrition_search", lambda: importlib.import_module("nutrition_search"))
 
 # object classes
 classNames = ["person", "bicycle", "car", "motorbike", "aeroplane", "bus", "train", "truck", "boat",
@@ -47,194 +86,264 @@ classNames = ["person", "bicycle", "car", "motorbike", "aeroplane", "bus", "trai
               "teddy bear", "hair drier", "toothbrush"
               ]
 
-def run_detection():
-    """Run the detection process"""
-    global detection_active, camera_open_success
-
-    print("[run_detection] Thread started.")
-    # Initialize webcam
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("[run_detection] Error: Could not open webcam.")
-        camera_open_success = False # Set flag to indicate failure
-        detection_active = False # Ensure detection stops if camera can't be opened
-        print("[run_detection] Exiting thread due to camera open failure.")
+# Class ids of the tracked foods, for restricting the model at predict time
+tracked_class_ids = [classNames.index(food) for food in foods]
+
+# Dedup settings for each camera's TrackTable (see tracker.py)
+TRACKER_SETTINGS = {
+    "capacity": 32,
+    "iou_threshold": 0.3,
+    "expire_seconds": 3.0, # how long an item may go undetected before it counts as gone
+    "track_cooldown": None, # log each physical item once
+    "class_cooldown": 1.0
+}
+
+def extract_boxes(results):
+    """Converts YOLO results for a frame into one Detections set of NumPy arrays."""
+    return Detections.from_results(results)
+
+def log_detections(boxes, dedup_state, camera_name=DEFAULT_CAMERA):
+    """
+    Logging stage: logs each physical tracked food once. Detections are filtered
+    to the tracked foods as an array operation and matched to the camera's
+    TrackTable, so several items or alternating foods are not logged repeatedly.
+    """
+    tracker = dedup_state.get("tracker")
+    if tracker is None:
+        tracker = dedup_state["tracker"] = TrackTable(**TRACKER_SETTINGS)
+
+    tracked = boxes[tracked_mask(boxes, tracked_class_ids)]
+    if not len(tracked):
         return
-    
-    camera_open_success = True # Set flag to indicate success
-    print("[run_detection] Webcam opened successfully.")
-    
-    cap.set(3, 640)
-    cap.set(4, 480)
-    
-    last_detected = ""
-    last_detection_time = datetime.min
 
-    try:
-        frame_count = 0
-        while detection_active:
-            frame_count += 1
-            success, img = cap.read()
-            if not success:
-                print(f"[run_detection] Warning: Could not read frame {frame_count} from webcam.")
-                # If camera disconnects, stop detection 
-                if not cap.isOpened():
-                    print("[run_detection] Error: Webcam disconnected during read. Stopping detection.")
-                    detection_active = False
-                    break # Exit loop if camera truly disconnected
-                continue # Try reading next frame if not successful but camera still open
-                
-            results = model(img, stream=True)
-
-            # coordinates
-            for r in results:
-                boxes = r.boxes
-
-                for box in boxes:
-                    # bounding box
-                    x1, y1, x2, y2 = box.xyxy[0]
-                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2) # convert to int values
-
-                    # put box in cam
-                    cv2.rectangle(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
-
-                    # confidence
-                    confidence = math.ceil((box.conf[0]*100))/100
-                    # class name
-                    cls = int(box.cls[0])
-                    
-                    # Only track items in 'foods' list
-                    if classNames[cls] in foods:
-                        
-                        current_time = datetime.now()
-                        
-                        # Don't track duplicates of the same object
-                        # Added a check for cooldown_seconds if you decide to implement it
-                        if last_detected != classNames[cls] or (current_time - last_detection_time).total_seconds() > 10: 
-                            print("Confidence --->",confidence)
-                            print("Class name -->", classNames[cls])
-                            print(last_detected)
-
-                            # Log to JSON
-                            new_entry = {
-                                "food": classNames[cls],
-                                "timestamp": current_time.isoformat()
-                            }
-
-                            # Read → Append → Write
-                            with open(food_log, "r+") as f:
-                                try:
-                                    data = json.load(f)
-                                except json.JSONDecodeError:
-                                    data = []
-
-                                data.append(new_entry)
-
-                                f.seek(0)
-                                json.dump(data, f, indent=4)
-                                f.truncate()
-
-                            last_detected = classNames[cls]
-                            last_detection_time = current_time # Update last detection time
-
-                    # object details
-                    org = [x1, y1]
-                    font = cv2.FONT_HERSHEY_SIMPLEX
-                    fontScale = 1
-                    color = (255, 0, 0)
-                    thickness = 2
-
-                    cv2.putText(img, classNames[cls], org, font, fontScale, color, thickness)
-
-            cv2.imshow('Webcam', img)
-            key = cv2.waitKey(1)
-            if key == ord('q'):
-                print("[run_detection] 'q' pressed. Stopping detection.")
-                detection_active = False # User pressed 'q' to quit
-                break # Exit the while loop
+    new = tracked[tracker.update(tracked.xyxy, tracked.class_id, time.monotonic())]
+    if not len(new):
+        return
 
-    except Exception as e:
-        print(f"[run_detection] An unexpected error occurred: {e}")
-        detection_active = False # Ensure detection stops on unexpected errors
-    finally:
-        print("[run_detection] Detection loop ended. Cleaning up resources.")
-        # Cleanup
-        cap.release()
-        cv2.destroyAllWindows()
-        print("[run_detection] Resources released. Thread exiting.")
+    current_time = datetime.now()
+    for confidence, cls in zip(new.confidence.tolist(), new.class_id.tolist()):
+        log.debug("Detected %s (confidence %.2f)", classNames[cls], confidence)
+
+        # Log to JSON
+        new_entry = {
+            "food": classNames[cls],
+            "timestamp": current_time.isoformat()
+        }
+        if camera_name != DEFAULT_CAMERA:
+            new_entry["camera"] = camera_name
+
+        food_log.append(new_entry)
+        detection_events.publish(new_entry)
+
+def draw_boxes(img, boxes):
+    """Render stage: draws the boxes and class names onto img."""
+    for (x1, y1, x2, y2), cls in zip(boxes.xyxy.tolist(), boxes.class_id.tolist()):
+        # put box in cam
+        cv2.rectangle(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
+
+        # object details
+        org = [x1, y1]
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        fontScale = 1
+        color = (255, 0, 0)
+        thickness = 2
+
+        cv2.putText(img, classNames[cls], org, font, fontScale, color, thickness)
+
+def window_name(camera):
+    return 'Webcam' if camera.name == DEFAULT_CAMERA else f'Webcam - {camera.name}'
+
+def handle_frame(camera, img, boxes, detected):
+    """Logging/render stage for one camera; returns False to stop it."""
+    if boxes is None: # nothing detected on this camera yet
+        boxes = Detections.empty()
+
+    # Held boxes from skipped frames are drawn but never logged again
+    if detected:
+        log_detections(boxes, camera.dedup_state, camera.name)
+    draw_boxes(img, boxes)
+
+    if camera.display:
+        display.show(window_name(camera), img)
+    return True
+
+def on_key(key):
+    # waitKey doesn't say which window had focus, so 'q' stops every displayed camera
+    if key == ord('q'):
+        for camera in detection_manager.active_cameras():
+            if camera.display:
+                log.info("'q' pressed. Stopping camera '%s'.", camera.name)
+                detection_manager.stop(camera.name)
+
+def on_camera_stopped(camera):
+    profile_results[camera.profile.name] = camera.stats.snapshot()
+    if camera.display:
+        display.close(window_name(camera))
+
+# All windows are drawn from one thread; HighGUI is not thread-safe
+display = Display(on_key=on_key)
+
+# All cameras share the loaded model; frames from cameras on the same profile are batched
+detection_manager = DetectionManager(
+    get_model=model.get,
+    open_source=open_source,
+    extract_boxes=extract_boxes,
+    handle_frame=handle_frame,
+    on_camera_stopped=on_camera_stopped,
+    tracked_class_ids=tracked_class_ids
+)
 
 @app.route('/api/start-detection', methods=['POST'])
 def start_detection():
-    """Start the detection process"""
-    global detection_active, detection_thread, camera_open_success
-    
-    if detection_active:
-        return jsonify({"status": "error", "message": "Detection already active"}), 400
-    
-    detection_active = True
-    camera_open_success = None # Reset status before starting the thread
-    detection_thread = threading.Thread(target=run_detection)
-    detection_thread.start()
-    
-    # Wait a short while for the camera to initialize in the thread
-    timeout = 5 # seconds
-    start_time = datetime.now()
-    while camera_open_success is None and (datetime.now() - start_time).total_seconds() < timeout:
-        time.sleep(0.1) # Check every 100ms
-
-    if camera_open_success is False:
+    """
+    Start detection on a camera. Optional JSON body:
+    {"camera": "default", "source": 0, "profile": "full", "display": true}
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Request body must be a JSON object"}), 400
+    name = data.get("camera", DEFAULT_CAMERA)
+    try:
+        if not isinstance(name, str) or not name:
+            raise ValueError("'camera' must be a non-empty string")
+        if data.get("profile") is not None and not isinstance(data["profile"], str):
+            raise ValueError("'profile' must be a string")
+        if not isinstance(data.get("display", True), bool):
+            raise ValueError("'display' must be true or false")
+        profile = get_profile(data.get("profile"))
+        camera = detection_manager.start(
+            name,
+            source=validate_source(data.get("source", 0)),
+            profile=profile,
+            display=data.get("display", True),
+            timeout=CAMERA_OPEN_TIMEOUT
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    if camera.status == "failed":
         # Camera failed to open
-        detection_active = False # Ensure the main state reflects failure
         return jsonify({"status": "error", "message": "Failed to open webcam. It might be in use, disconnected, or permissions are not granted."}), 500
-    elif camera_open_success is None:
-        # Timeout occurred, camera status still unknown (e.g., thread didn't even start or got stuck)
-        detection_active = False # Assume failure or issue
+    elif camera.status != "running":
+        # Timeout occurred, camera status still unknown
         return jsonify({"status": "error", "message": "Timed out waiting for webcam to initialize. Check camera connection and permissions."}), 500
     else:
         # Camera opened successfully
-        return jsonify({"status": "success", "message": "Detection started"})
+        return jsonify({"status": "success", "message": "Detection started", "camera": name})
 
 @app.route('/api/stop-detection', methods=['POST'])
 def stop_detection():
-    """Stop the detection process"""
-    global detection_active
-    
-    if not detection_active:
+    """Stop detection on one camera ({"camera": name}) or, with no body, on all cameras"""
+    data = request.get_json(silent=True) or {}
+    name = data.get("camera")
+
+    if name:
+        stopped = [name] if detection_manager.stop(name) else []
+    else:
+        stopped = detection_manager.stop_all()
+    if not stopped:
         return jsonify({"status": "error", "message": "Detection not active"}), 400
-    
-    detection_active = False
-    
-    return jsonify({"status": "success", "message": "Detection stopped"})
+
+    return jsonify({"status": "success", "message": "Detection stopped", "cameras": stopped})
 
 @app.route('/api/detection-status', methods=['GET'])
 def get_detection_status():
     """Get current detection status"""
-    global detection_active
-    
+    active = bool(detection_manager.active_cameras())
+    status = detection_manager.status()
+    default_camera = status["cameras"].get(DEFAULT_CAMERA)
+
     return jsonify({
-        "active": detection_active,
-        "message": "Detection active" if detection_active else "Detection inactive"
+        "active": active,
+        "message": "Detection active" if active else "Detection inactive",
+        "pipeline": default_camera["pipeline"] if default_camera else None,
+        **status
+    })
+
+@app.route('/api/detection-profiles', methods=['GET'])
+def get_detection_profiles():
+    """List inference profiles with the FPS/CPU figures measured on their last run"""
+    return jsonify({
+        "status": "success",
+        "profiles": [
+            {**profile.to_dict(), "last_run": profile_results.get(name)}
+            for name, profile in INFERENCE_PROFILES.items()
+        ]
     })
 
 @app.route('/api/detection-results', methods=['GET'])
 def get_detection_results():
-    """Get detection results from the food log"""
+    """
+    Get detection results from the food log.
+
+    Optional query parameters:
+      since=<ISO timestamp>  only entries logged after this time
+      cursor=<n>             start at entry n (use next_cursor from the previous page)
+      limit=<n>              at most n entries
+    Responses carry an ETag; a matching If-None-Match returns 304 with no body.
+    """
     try:
-        if os.path.exists(food_log):
-            with open(food_log, 'r') as f:
-                data = json.load(f)
-            return jsonify({"status": "success", "results": data})
-        else:
-            return jsonify({"status": "success", "results": []})
+        since = request.args.get('since')
+        cursor = request.args.get('cursor', 0, type=int)
+        limit = request.args.get('limit', type=int)
+
+        etag = f"{food_log.etag()}-{cursor}-{limit}-{since or ''}"
+        if request.if_none_match.contains(etag):
+            return '', 304, {"ETag": f'"{etag}"'}
+
+        results, next_cursor, total = food_log.read_page(cursor=cursor, limit=limit, since=since)
+        with SERIALIZE_SECONDS.time(endpoint="/api/detection-results"):
+            response = jsonify({
+                "status": "success",
+                "results": results,
+                "next_cursor": next_cursor,
+                "total": total
+            })
+        response.set_etag(etag)
+        return response
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/detections/stream', methods=['GET'])
+def stream_detections():
+    """
+    Server-sent events stream of new food log entries as they are detected.
+    Clients that fall too far behind receive an 'overflow' event and should
+    reconnect, catching up through /api/detection-results?since=...
+    """
+    subscription = detection_events.subscribe()
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                item = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if item is None:
+                    if subscription.closed.is_set():
+                        yield "event: overflow\ndata: {}\n\n"
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id, entry = item
+                with SERIALIZE_SECONDS.time(endpoint="/api/detections/stream"):
+                    payload = json.dumps(entry)
+                yield f"id: {event_id}\nevent: detection\ndata: {payload}\n\n"
+        finally:
+            detection_events.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route('/api/clear-results', methods=['POST'])
 def clear_results():
     """Clear detection results"""
     try:
-        with open(food_log, 'w') as f:
-            json.dump([], f)
+        food_log.clear()
         return jsonify({"status": "success", "message": "Results cleared"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -248,19 +357,35 @@ def nutrition_info_endpoint():
     if not food_item:
         return jsonify({"status": "error", "message": "No food_item provided"}), 400
 
-    print(f"Received request for nutrition info for: {food_item}")
+    log.info("Received request for nutrition info for: %s", food_item)
 
-    from backend.search_scripts.nutrition_search import get_nutrition_info
-    nutrition_data = get_nutrition_info(food_item)
-    print(f"Nutrition search result: {nutrition_data}")
+    try:
+        search = nutrition_search.get()
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"Nutrition search unavailable: {e}"}), 503
+    nutrition_data = search.get_nutrition_info(food_item)
+    log.debug("Nutrition search result: %s", nutrition_data)
 
     return jsonify({"status": "success", "nutrition_info": nutrition_data})
 
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Liveness: the process is up and answering requests"""
+    return jsonify({"status": "ok"})
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness: 200 once the model is loaded, 503 while it is still loading"""
+    is_ready = model.ready
+    return jsonify({
+        "status": "ready" if is_ready else "starting",
+        "model": model.status(),
+        "nutrition_search": nutrition_search.status()
+    }), 200 if is_ready else 503
+
 if __name__ == '__main__':
 
-    if not os.path.exists(food_log):
-        with open(food_log, "w") as f:
-            json.dump([], f)
-    
+    # Load the model in the background so the first detection does not wait for it
+    model.warm_up()
     print("Flask API starting on http://localhost:5000")
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
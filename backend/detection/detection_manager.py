@@ -0,0 +1,276 @@
+import threading
+import time
+
+from metrics import ERRORS, INFERENCE_SECONDS, get_logger, span
+from pipeline import LatestQueue, PipelineStats
+
+log = get_logger("detection_manager")
+
+# How long a stopped camera's render thread still waits for its source to finish opening
+OPEN_GRACE_SECONDS = 1.0
+
+
+class Camera:
+    """One named frame source with its own lifecycle, queues and stats."""
+
+    def __init__(self, name, source, profile, display=True):
+        self.name = name
+        self.source = source
+        self.profile = profile
+        self.display = display
+
+        self.status = "starting"  # starting -> running -> stopped, or failed
+        self.error = None
+        self.ready = threading.Event()  # set once the source has opened or failed
+        self.stop_event = threading.Event()
+
+        self.frames = LatestQueue(maxsize=1)  # capture -> inference
+        self.results = LatestQueue(maxsize=1)  # inference -> logging/render
+        self.stats = PipelineStats(profile)
+        self.stats.queues = {"capture": self.frames, "inference": self.results}
+
+        self.frame_index = 0
+        self.last_boxes = None
+        self.dedup_state = {}  # owned by the frame handler
+        self.threads = []
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("starting", "running")
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "source": str(self.source),
+            "status": self.status,
+            "error": self.error,
+            "display": self.display,
+            "pipeline": self.stats.snapshot(),
+        }
+
+
+class DetectionManager:
+    """
+    Owns any number of named cameras that share one YOLO model.
+
+    Each camera has a capture thread and a logging/render thread of its own.
+    A single inference thread takes the latest frame from every running camera
+    and runs cameras that share a profile through the model as one batch.
+
+    get_model()                                   returns the shared model
+    open_source(source)                           returns a cv2.VideoCapture-like object
+    extract_boxes(results)                        turns results for one frame into boxes
+    handle_frame(camera, img, boxes, detected)    logs/draws; return False to stop the camera
+    on_camera_stopped(camera)                     optional cleanup hook
+    """
+
+    def __init__(self, get_model, open_source, extract_boxes, handle_frame, on_camera_stopped=None,
+                 tracked_class_ids=()):
+        self.get_model = get_model
+        self.open_source = open_source
+        self.extract_boxes = extract_boxes
+        self.handle_frame = handle_frame
+        self.on_camera_stopped = on_camera_stopped
+        self.tracked_class_ids = list(tracked_class_ids)
+
+        self.cameras = {}
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._inference_thread = None
+
+        self.batches = 0
+        self.batched_frames = 0
+
+    # --- lifecycle ---
+
+    def start(self, name, source=0, profile=None, display=True, timeout=5.0) -> Camera:
+        """
+        Starts a camera and waits up to `timeout` seconds for its source to open.
+        Check the returned camera's status: 'running', 'failed', or still
+        'starting' if the source did not answer in time.
+        """
+        with self._lock:
+            existing = self.cameras.get(name)
+            if existing is not None and existing.active:
+                raise ValueError(f"Camera '{name}' is already active")
+            camera = Camera(name, source, profile, display)
+            self.cameras[name] = camera
+            self._ensure_inference_thread()
+
+        capture = threading.Thread(target=self._capture, args=(camera,), name=f"capture-{name}", daemon=True)
+        consumer = threading.Thread(target=self._consume, args=(camera,), name=f"render-{name}", daemon=True)
+        camera.threads = [capture, consumer]
+        capture.start()
+        consumer.start()
+
+        if not camera.ready.wait(timeout):
+            log.warning("Timed out waiting for camera '%s' to open.", name)
+            self.stop(name)
+        return camera
+
+    def stop(self, name) -> bool:
+        camera = self.cameras.get(name)
+        if camera is None or not camera.active:
+            return False
+        camera.stop_event.set()
+        self._frame_ready.set()
+        return True
+
+    def stop_all(self):
+        return [name for name in list(self.cameras) if self.stop(name)]
+
+    def active_cameras(self):
+        return [camera for camera in list(self.cameras.values()) if camera.active]
+
+    def status(self):
+        return {
+            "cameras": {name: camera.to_dict() for name, camera in list(self.cameras.items())},
+            "batches": self.batches,
+            "average_batch_size": round(self.batched_frames / self.batches, 2) if self.batches else None,
+        }
+
+    # --- stages ---
+
+    def _capture(self, camera):
+        """Capture stage: keeps only the latest frame of one camera."""
+        cap = self.open_source(camera.source)
+        if camera.stop_event.is_set():
+            # Stopped while the source was opening; if this took past the render thread's
+            # grace period, it has already marked the camera failed
+            cap.release()
+            camera.ready.set()
+            return
+        if not cap.isOpened():
+            log.error("Could not open source for camera '%s'.", camera.name)
+            camera.status = "failed"
+            camera.error = "Could not open source"
+            camera.stop_event.set()
+            camera.ready.set()
+            return
+
+        cap.set(3, 640)
+        cap.set(4, 480)
+        camera.status = "running"
+        camera.ready.set()
+        log.info("Camera '%s' opened successfully.", camera.name)
+
+        frame_count = 0
+        try:
+            while not camera.stop_event.is_set():
+                frame_count += 1
+                success, img = cap.read()
+                if not success:
+                    # If camera disconnects (or a replay ends), stop this camera
+                    if not cap.isOpened():
+                        log.info("Camera '%s' closed during read. Stopping it.", camera.name)
+                        break
+                    log.warning("Could not read frame %d from '%s'.", frame_count, camera.name)
+                    continue
+                camera.stats.counters["capture"].tick()
+                camera.frames.put((time.monotonic(), img))
+                self._frame_ready.set()
+        finally:
+            camera.stop_event.set()
+            self._frame_ready.set()
+            cap.release()
+
+    def _ensure_inference_thread(self):
+        if self._inference_thread is None or not self._inference_thread.is_alive():
+            self._inference_thread = threading.Thread(target=self._infer, name="inference", daemon=True)
+            self._inference_thread.start()
+
+    def _fail(self, camera, message):
+        camera.error = message
+        self.stop(camera.name)
+        camera.status = "failed"
+
+    def _infer(self):
+        """Inference stage shared by all cameras: one model call per profile per round."""
+        model = None
+        while True:
+            if not self._frame_ready.wait(timeout=0.5):
+                continue
+            self._frame_ready.clear()
+
+            if model is None:
+                try:
+                    model = self.get_model()
+                except Exception as e:
+                    # Fail the waiting cameras; the next start() retries the load
+                    ERRORS.inc(component="inference")
+                    log.error("Could not load the model: %s", e)
+                    for camera in self.active_cameras():
+                        self._fail(camera, f"Model failed to load: {e}")
+                    continue
+
+            batches = {}  # profile name -> [(camera, captured_at, img)]
+            for camera in self.active_cameras():
+                item = camera.frames.get_nowait()
+                if item is None:
+                    continue
+                captured_at, img = item
+                detect_now = camera.profile.should_detect(camera.frame_index)
+                camera.frame_index += 1
+                if detect_now:
+                    batches.setdefault(camera.profile.name, []).append((camera, captured_at, img))
+                else:
+                    # Skipped frame: pass the held boxes on for display only
+                    camera.stats.counters["inference"].tick()
+                    camera.results.put((captured_at, img, camera.last_boxes, False))
+
+            for items in batches.values():
+                profile = items[0][0].profile
+                try:
+                    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+                    with span("yolo.inference"):
+                        results = list(model([img for _, _, img in items], stream=True,
+                                             **profile.predict_kwargs(self.tracked_class_ids)))
+                    wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+                    INFERENCE_SECONDS.observe(wall, profile=profile.name)
+                except Exception as e:
+                    ERRORS.inc(component="inference")
+                    log.error("Inference failed: %s", e)
+                    for camera, _, _ in items:
+                        camera.error = f"Inference failed: {e}"
+                        self.stop(camera.name)
+                    continue
+
+                self.batches += 1
+                self.batched_frames += len(items)
+                for (camera, captured_at, img), result in zip(items, results):
+                    # Split the batch cost evenly between the cameras in it
+                    camera.stats.record_inference(wall / len(items), cpu / len(items))
+                    camera.stats.counters["inference"].tick()
+                    camera.last_boxes = self.extract_boxes([result])
+                    camera.results.put((captured_at, img, camera.last_boxes, True))
+
+    def _consume(self, camera):
+        """Logging/render stage for one camera."""
+        try:
+            while not camera.stop_event.is_set():
+                item = camera.results.get(timeout=0.1)
+                if item is None:
+                    continue
+                captured_at, img, boxes, detected = item
+                keep_running = self.handle_frame(camera, img, boxes, detected)
+                camera.stats.counters["render"].tick()
+                camera.stats.last_latency_ms = round((time.monotonic() - captured_at) * 1000, 1)
+                if keep_running is False:
+                    break
+        except Exception as e:
+            ERRORS.inc(component="camera")
+            log.error("An unexpected error occurred on camera '%s': %s", camera.name, e)
+            camera.error = str(e)
+        finally:
+            camera.stop_event.set()
+            if camera.ready.wait(OPEN_GRACE_SECONDS):
+                camera.threads[0].join(timeout=2) # let capture release the source
+            else:
+                # The source is still opening (e.g. a hung stream URL); free the name anyway
+                camera.status = "failed"
+                camera.error = "Timed out opening source"
+            if camera.status != "failed":
+                camera.status = "stopped"
+            if self.on_camera_stopped:
+                self.on_camera_stopped(camera)
+            log.info("Camera '%s' stopped.", camera.name)
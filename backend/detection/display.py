@@ -0,0 +1,60 @@
+import threading
+import time
+
+import cv2
+
+
+class Display:
+    """
+    Shows the frames of every displayed camera from one thread.
+
+    HighGUI (cv2.imshow, waitKey, destroyWindow) is not thread-safe, so the
+    per-camera render threads only hand over their latest frame with show()
+    and ask for a window to be closed with close(); this thread owns every
+    window. `on_key(key)` is called with each key pressed in any window.
+    """
+
+    def __init__(self, on_key=None, idle_interval=0.05):
+        self.on_key = on_key
+        self.idle_interval = idle_interval
+        self._lock = threading.Lock()
+        self._frames = {}  # window -> latest frame not shown yet
+        self._closing = set()
+        self._thread = None
+
+    def show(self, window, img):
+        with self._lock:
+            self._frames[window] = img
+            self._closing.discard(window)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="display", daemon=True)
+                self._thread.start()
+
+    def close(self, window):
+        with self._lock:
+            self._frames.pop(window, None)
+            self._closing.add(window)
+
+    def _run(self):
+        open_windows = set()
+        while True:
+            with self._lock:
+                frames, self._frames = self._frames, {}
+                closing, self._closing = self._closing, set()
+
+            for window in closing & open_windows:
+                try:
+                    cv2.destroyWindow(window)
+                except cv2.error:
+                    pass # already closed by the user
+                open_windows.discard(window)
+            for window, img in frames.items():
+                cv2.imshow(window, img)
+                open_windows.add(window)
+
+            if not open_windows:
+                time.sleep(self.idle_interval)
+                continue
+            key = cv2.waitKey(1)
+            if key != -1 and self.on_key:
+                self.on_key(key)
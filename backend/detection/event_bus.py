@@ -0,0 +1,87 @@
+import itertools
+import queue
+import threading
+
+from metrics import get_logger
+
+log = get_logger("event_bus")
+
+
+class Subscription:
+    """One subscriber's bounded queue of (event_id, event) pairs."""
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0  # events discarded because this subscriber fell behind
+        self.closed = threading.Event()
+
+    def get(self, timeout=None):
+        """Returns the next (event_id, event), or None on timeout or once closed."""
+        if self.closed.is_set() and self.queue.empty():
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """
+    In-memory fan-out of events to any number of subscribers.
+
+    publish() never blocks: a subscriber whose queue is full loses its oldest
+    event instead. One that keeps falling behind (more than `max_dropped`
+    events lost) is closed so it can reconnect and resync.
+    """
+
+    def __init__(self, queue_size=256, max_dropped=1024):
+        self.queue_size = queue_size
+        self.max_dropped = max_dropped
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+        self.published = 0
+        self.disconnected = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed.set()
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            event_id = next(self._ids)
+            self.published += 1
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            while True:
+                try:
+                    subscription.queue.put_nowait((event_id, event))
+                    break
+                except queue.Full:
+                    try:
+                        subscription.queue.get_nowait()
+                        subscription.dropped += 1
+                    except queue.Empty:
+                        pass
+            if subscription.dropped > self.max_dropped:
+                log.warning("Closing slow subscriber after %d dropped events", subscription.dropped)
+                self.unsubscribe(subscription)
+                self.disconnected += 1
+        return event_id
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "disconnected": self.disconnected,
+            }
@@ -0,0 +1,118 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+class ImageFolderSource:
+    """Replays the images in a directory (sorted by name) as frames."""
+
+    def __init__(self, path, loop=False, fps=None):
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.loop = loop
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self._index = 0
+        self._last_read = 0.0
+        self._opened = bool(self.paths)
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False  # frames keep their stored size
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        if self._index >= len(self.paths):
+            if not self.loop:
+                self._opened = False
+                return False, None
+            self._index = 0
+        _throttle(self)
+        img = cv2.imread(self.paths[self._index])
+        self._index += 1
+        return img is not None, img
+
+    def release(self):
+        self._opened = False
+
+
+class SyntheticSource:
+    """
+    Generates deterministic frames with a few coloured rectangles on noise.
+    Useful for measuring pipeline overhead without a camera or dataset.
+    """
+
+    def __init__(self, width=640, height=480, frames=None, fps=None, seed=0):
+        self.width = width
+        self.height = height
+        self.frames = frames  # None means endless
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self._rng = np.random.default_rng(seed)
+        self._count = 0
+        self._last_read = 0.0
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        return True
+
+    def read(self):
+        if not self._opened or (self.frames is not None and self._count >= self.frames):
+            self._opened = False
+            return False, None
+        _throttle(self)
+        img = self._rng.integers(0, 64, (self.height, self.width, 3), dtype=np.uint8)
+        for _ in range(3):
+            x, y = self._rng.integers(0, self.width - 80), self._rng.integers(0, self.height - 80)
+            w, h = self._rng.integers(40, 80, size=2)
+            color = tuple(int(c) for c in self._rng.integers(0, 255, 3))
+            cv2.rectangle(img, (int(x), int(y)), (int(x + w), int(y + h)), color, -1)
+        self._count += 1
+        return True, img
+
+    def release(self):
+        self._opened = False
+
+
+def _throttle(source):
+    """Sleeps so a replayed source does not exceed its configured fps."""
+    if source.frame_interval:
+        wait = source._last_read + source.frame_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        source._last_read = time.monotonic()
+
+
+def open_source(spec=0, loop=False, fps=None):
+    """
+    Opens a frame source with the cv2.VideoCapture interface
+    (isOpened / read / set / release).
+
+      0, 1, "0"             webcam index
+      "synthetic"           endless synthetic frames
+      "synthetic:500"       500 synthetic frames
+      path to a directory   image folder replay
+      any other path/URL    video file or stream, via cv2.VideoCapture
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return cv2.VideoCapture(int(spec))
+    if spec.startswith("synthetic"):
+        _, _, count = spec.partition(":")
+        return SyntheticSource(frames=int(count) if count else None, fps=fps)
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, loop=loop, fps=fps)
+    return cv2.VideoCapture(spec)
@@ -0,0 +1,57 @@
+import os
+
+
+class InferenceProfile:
+    """
+    How the YOLO detector is run for one deployment.
+
+    tracked_only  restrict the model to the tracked food class ids at predict time
+    detect_every  run the model on every Nth frame and hold the last boxes in between
+    imgsz         inference resolution; smaller values downscale the 640x480 input
+    conf / iou    confidence and NMS IoU thresholds passed to the model
+    """
+
+    def __init__(self, name, tracked_only=False, detect_every=1, imgsz=640, conf=0.25, iou=0.7):
+        self.name = name
+        self.tracked_only = tracked_only
+        self.detect_every = max(1, int(detect_every))
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+
+    def predict_kwargs(self, tracked_class_ids):
+        kwargs = {"imgsz": self.imgsz, "conf": self.conf, "iou": self.iou, "verbose": False}
+        if self.tracked_only:
+            kwargs["classes"] = list(tracked_class_ids)
+        return kwargs
+
+    def should_detect(self, frame_index) -> bool:
+        return frame_index % self.detect_every == 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "tracked_only": self.tracked_only,
+            "detect_every": self.detect_every,
+            "imgsz": self.imgsz,
+            "conf": self.conf,
+            "iou": self.iou,
+        }
+
+
+INFERENCE_PROFILES = {
+    # Original behaviour: every class, every frame, full resolution
+    "full": InferenceProfile("full"),
+    "balanced": InferenceProfile("balanced", tracked_only=True, detect_every=2, imgsz=480, conf=0.35, iou=0.6),
+    # For CPU-only boxes
+    "fast": InferenceProfile("fast", tracked_only=True, detect_every=4, imgsz=320, conf=0.4, iou=0.5),
+}
+
+DEFAULT_PROFILE = os.environ.get("DETECTION_PROFILE", "full")
+
+
+def get_profile(name=None) -> InferenceProfile:
+    name = name or DEFAULT_PROFILE
+    if name not in INFERENCE_PROFILES:
+        raise ValueError(f"Unknown detection profile '{name}'. Choose one of: {', '.join(INFERENCE_PROFILES)}")
+    return INFERENCE_PROFILES[name]
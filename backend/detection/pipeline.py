@@ -0,0 +1,107 @@
+import collections
+import queue
+import threading
+import time
+
+
+class FpsCounter:
+    """Frames-per-second over a sliding time window."""
+
+    def __init__(self, window_seconds=2.0):
+        self.window_seconds = window_seconds
+        self._ticks = collections.deque()
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def tick(self):
+        now = time.monotonic()
+        with self._lock:
+            self._ticks.append(now)
+            self.total += 1
+            while self._ticks and now - self._ticks[0] > self.window_seconds:
+                self._ticks.popleft()
+
+    @property
+    def fps(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            while self._ticks and now - self._ticks[0] > self.window_seconds:
+                self._ticks.popleft()
+            if len(self._ticks) < 2:
+                return 0.0
+            span = now - self._ticks[0]
+            return round((len(self._ticks) - 1) / span, 2) if span > 0 else 0.0
+
+
+class LatestQueue:
+    """
+    Bounded queue between pipeline stages that never blocks the producer.
+    When full, the oldest item is dropped so consumers always see fresh frames.
+    """
+
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Returns the next item, or None if nothing arrives within `timeout`."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_nowait(self):
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class PipelineStats:
+    """Per-stage FPS counters plus dropped-frame and latency figures for one pipeline run."""
+
+    STAGES = ("capture", "inference", "render")
+
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.counters = {stage: FpsCounter() for stage in self.STAGES}
+        self.queues = {}
+        self.last_latency_ms = None  # capture -> render for the most recent frame
+
+        self.started_at = time.monotonic()
+        self._process_cpu_start = time.process_time()
+        self.inference_runs = 0
+        self.inference_wall_seconds = 0.0
+        self.inference_cpu_seconds = 0.0
+
+    def record_inference(self, wall_seconds, cpu_seconds):
+        self.inference_runs += 1
+        self.inference_wall_seconds += wall_seconds
+        self.inference_cpu_seconds += cpu_seconds
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        runs = self.inference_runs
+        return {
+            "profile": self.profile.to_dict() if self.profile else None,
+            "fps": {stage: counter.fps for stage, counter in self.counters.items()},
+            "frames": {stage: counter.total for stage, counter in self.counters.items()},
+            "dropped": {name: q.dropped for name, q in self.queues.items()},
+            "latency_ms": self.last_latency_ms,
+            "inference_runs": runs,
+            "inference_ms": round(self.inference_wall_seconds / runs * 1000, 2) if runs else None,
+            "inference_cpu_ms": round(self.inference_cpu_seconds / runs * 1000, 2) if runs else None,
+            "process_cpu_percent": round((time.process_time() - self._process_cpu_start) / elapsed * 100, 1),
+        }
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class Detections:
+    """
+    All boxes of one frame as parallel NumPy arrays:
+    xyxy (N, 4) int32 pixel corners, confidence (N,) rounded up to 2 decimals,
+    class_id (N,) int32 COCO class ids.
+    """
+
+    __slots__ = ("xyxy", "confidence", "class_id")
+
+    def __init__(self, xyxy, confidence, class_id):
+        self.xyxy = xyxy
+        self.confidence = confidence
+        self.class_id = class_id
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4), dtype=np.int32), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int32))
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Converts YOLO results with one device-to-host copy per result
+        (boxes.data is N x [x1, y1, x2, y2, conf, cls]).
+        """
+        arrays = []
+        for r in results:
+            data = r.boxes.data
+            if hasattr(data, "cpu"):
+                data = data.cpu().numpy()
+            arrays.append(np.asarray(data, dtype=np.float32).reshape(-1, 6))
+        if not arrays:
+            return cls.empty()
+        data = np.concatenate(arrays) if len(arrays) > 1 else arrays[0]
+        return cls(
+            data[:, :4].astype(np.int32),
+            np.ceil(data[:, 4] * 100) / 100,
+            data[:, 5].astype(np.int32),
+        )
+
+    def __len__(self):
+        return len(self.class_id)
+
+    def __getitem__(self, mask):
+        return Detections(self.xyxy[mask], self.confidence[mask], self.class_id[mask])
+
+
+def tracked_mask(detections, tracked_class_ids):
+    """Boolean mask of the detections whose class is being tracked."""
+    return np.isin(detections.class_id, np.asarray(tracked_class_ids, dtype=np.int32))
+
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between boxes a (N, 4) and b (M, 4) in xyxy format."""
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+
+
+def centroid_distance(a, b):
+    """Pairwise centroid distance, relative to the diagonal of the boxes in b."""
+    ca = (a[:, None, :2] + a[:, None, 2:]) / 2.0
+    cb = (b[None, :, :2] + b[None, :, 2:]) / 2.0
+    diagonal = np.hypot(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1])
+    return np.linalg.norm(ca - cb, axis=2) / np.maximum(diagonal[None, :], 1.0)
+
+
+class TrackTable:
+    """
+    Fixed-capacity table of tracked food items used to decide what to log.
+
+    Detections are matched to live tracks of the same class by IoU, falling
+    back to centroid distance for items that moved quickly. Unmatched
+    detections start new tracks. Tracks unseen for `expire_seconds` are freed,
+    and when the table is full the least recently seen track is replaced, so
+    memory stays constant.
+
+    A track is logged when it first appears, and again only after
+    `track_cooldown` seconds (None means once per track). Independently, a
+    class is not logged again within `class_cooldown` seconds of its last log
+    from an earlier frame; a new track held back this way is logged once the
+    class cooldown expires.
+    """
+
+    def __init__(self, capacity=32, iou_threshold=0.3, max_centroid_distance=0.5,
+                 expire_seconds=3.0, track_cooldown=None, class_cooldown=1.0):
+        self.capacity = capacity
+        self.iou_threshold = iou_threshold
+        self.max_centroid_distance = max_centroid_distance
+        self.expire_seconds = expire_seconds
+        self.track_cooldown = track_cooldown
+        self.class_cooldown = class_cooldown
+
+        self.boxes = np.zeros((capacity, 4), dtype=np.float32)
+        self.class_id = np.full(capacity, -1, dtype=np.int32)
+        self.last_seen = np.full(capacity, -np.inf)
+        self.logged_at = np.full(capacity, -np.inf)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.class_logged_at = {}
+
+        self.tracks_created = 0
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def _expire(self, now):
+        self.alive &= (now - self.last_seen) <= self.expire_seconds
+
+    def _associate(self, boxes, class_ids):
+        """Greedy one-to-one matching; returns the track slot per detection or -1."""
+        matches = np.full(len(boxes), -1, dtype=np.int64)
+        slots = np.flatnonzero(self.alive)
+        if not len(slots) or not len(boxes):
+            return matches
+
+        track_boxes = self.boxes[slots]
+        same_class = class_ids[:, None] == self.class_id[slots][None, :]
+        iou = np.where(same_class, iou_matrix(boxes, track_boxes), 0.0)
+        distance = np.where(same_class, centroid_distance(boxes, track_boxes), np.inf)
+
+        # IoU matches rank first, centroid-only matches after them by closeness
+        score = np.where(iou >= self.iou_threshold, 1.0 + iou,
+                         np.where(distance <= self.max_centroid_distance, 1.0 - distance, 0.0))
+        order = np.argsort(-score, axis=None)
+        used_detections, used_tracks = set(), set()
+        for flat in order:
+            d, t = divmod(int(flat), len(slots))
+            if score[d, t] <= 0:
+                break
+            if d in used_detections or t in used_tracks:
+                continue
+            matches[d] = slots[t]
+            used_detections.add(d)
+            used_tracks.add(t)
+        return matches
+
+    def _allocate(self):
+        free = np.flatnonzero(~self.alive)
+        if len(free):
+            return int(free[0])
+        return int(np.argmin(self.last_seen))  # full: reuse the stalest track
+
+    def update(self, boxes, class_ids, now):
+        """
+        Feeds one frame of tracked-class detections (boxes (N, 4), class_ids (N,))
+        and returns a boolean mask of the detections that should be logged.
+        `now` is a monotonic timestamp in seconds.
+        """
+        self._expire(now)
+        matches = self._associate(boxes, class_ids)
+
+        should_log = np.zeros(len(boxes), dtype=bool)
+        class_logged_before = dict(self.class_logged_at)
+        for i in range(len(boxes)):
+            slot = int(matches[i])
+            if slot < 0:
+                slot = self._allocate()
+                self.class_id[slot] = class_ids[i]
+                self.logged_at[slot] = -np.inf
+                self.alive[slot] = True
+                self.tracks_created += 1
+            self.boxes[slot] = boxes[i]
+            self.last_seen[slot] = now
+
+            if self.track_cooldown is None:
+                track_due = self.logged_at[slot] == -np.inf
+            else:
+                track_due = now - self.logged_at[slot] > self.track_cooldown
+            class_due = now - class_logged_before.get(int(class_ids[i]), -np.inf) > self.class_cooldown
+            if track_due and class_due:
+                should_log[i] = True
+                self.logged_at[slot] = now
+                self.class_logged_at[int(class_ids[i])] = now
+            elif track_due and self.logged_at[slot] != -np.inf:
+                # Re-log suppressed by the class cooldown: restart the track's cooldown.
+                # A track never logged stays pending until the class cooldown expires.
+                self.logged_at[slot] = now
+        return should_log
@@ -0,0 +1,240 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+
+from metrics import LOG_WRITE_SECONDS, get_logger
+
+log = get_logger("food_log_store")
+
+# Detections are written by detection/detect.py and read by main.py
+DEFAULT_FOOD_LOG_PATH = os.environ.get("FOOD_LOG_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "detection", "food_logs.jsonl"
+)
+
+
+class FoodLogStore:
+    """
+    Append-only food log stored as JSON Lines (one entry per line).
+
+    Appends write a single line with O_APPEND and fsync it, so they cost the
+    same no matter how long the log is. A crash can at worst leave a partial
+    last line, which readers ignore and the writer (writer=True, the detector)
+    trims when it next opens the log. Readers never take the writer lock or
+    modify the file: they only parse up to the last complete line.
+
+    For paging, the store keeps an in-memory index of each entry's byte offset
+    and timestamp. It is extended by reading only the bytes appended since the
+    last refresh, so a poll costs O(new entries + page size).
+
+    clear() swaps in a new empty file rather than truncating, so every reader
+    (in this process or another) notices a clear by the file's identity
+    changing, even after new entries have grown it past the old size.
+    """
+
+    def __init__(self, path=DEFAULT_FOOD_LOG_PATH, legacy_path=None, writer=False):
+        self.path = path
+        # The old format was one JSON array rewritten on every detection
+        self.legacy_path = legacy_path or os.path.splitext(path)[0] + ".json"
+        self._lock = threading.Lock()
+
+        self._index_lock = threading.Lock()
+        self._offsets = []  # byte offset of each entry
+        self._timestamps = []  # ISO timestamp of each entry, in append order
+        self._indexed_size = 0
+        self._file_id = None  # (st_dev, st_ino) of the file the index describes
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not os.path.exists(self.path):
+            with self._lock:
+                self._migrate_legacy()
+        if writer:
+            self._trim_partial_line()
+
+    def _migrate_legacy(self):
+        """
+        One-time import of the legacy JSON array into a fresh JSON Lines file.
+        Several processes may start at once (detect.py and main.py), so each
+        writes its own temp file and publishes it with os.link, which fails
+        instead of overwriting when another process created the log first.
+        Must hold _lock.
+        """
+        if os.path.exists(self.path):
+            return
+        entries = []
+        if os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, "r") as f:
+                    entries = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                log.warning("Could not read legacy log %s: %s", self.legacy_path, e)
+            if entries:
+                log.info("Migrating %d entries from %s", len(entries), self.legacy_path)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".food_log.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            try:
+                os.link(tmp_path, self.path)
+            except FileExistsError:
+                pass # another process migrated first; its log (and any appends since) win
+        finally:
+            os.remove(tmp_path)
+
+    def _trim_partial_line(self):
+        """Drops a torn last line left behind by a crash mid-append."""
+        with self._lock, open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, entry: dict):
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock, LOG_WRITE_SECONDS.time():
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _open(self):
+        """Opens the log for reading; returns (file, (st_dev, st_ino), size), or (None, None, 0) if missing."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None, None, 0
+        stat = os.fstat(f.fileno())
+        return f, (stat.st_dev, stat.st_ino), stat.st_size
+
+    def read_all(self) -> list:
+        """Returns every complete entry in append order."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for line in data[:data.rfind(b"\n") + 1].splitlines():
+            if line.strip():
+                entries.append(json.loads(line))
+        return entries
+
+    def _refresh_index(self, f, file_id, size):
+        """Indexes entries appended since the last call, reading from the open file f. Must hold _index_lock."""
+        if file_id != self._file_id or size < self._indexed_size:
+            # Cleared (possibly by another process): start over
+            self._offsets, self._timestamps = [], []
+            self._indexed_size = 0
+            self._file_id = file_id
+        if f is None or size == self._indexed_size:
+            return
+
+        f.seek(self._indexed_size)
+        data = f.read(size - self._indexed_size)
+
+        position = 0
+        end = data.rfind(b"\n") + 1
+        while position < end:
+            newline = data.index(b"\n", position)
+            line = data[position:newline]
+            if line.strip():
+                self._offsets.append(self._indexed_size + position)
+                self._timestamps.append(json.loads(line).get("timestamp", ""))
+            position = newline + 1
+        self._indexed_size += end
+
+    def etag(self) -> str:
+        """Changes whenever entries are appended or the log is cleared."""
+        f, file_id, size = self._open()
+        try:
+            with self._index_lock:
+                self._refresh_index(f, file_id, size)
+                return f"{file_id[1] if file_id else 0}-{len(self._offsets)}"
+        finally:
+            if f is not None:
+                f.close()
+
+    def read_page(self, cursor=0, limit=None, since=None):
+        """
+        Returns (entries, next_cursor, total).
+
+        `cursor` is the index of the first entry to return, `since` skips every
+        entry whose timestamp is at or before it (ISO format) and `limit` caps
+        the page. Passing `next_cursor` back continues where the page ended.
+        """
+        f, file_id, size = self._open()
+        if f is None:
+            with self._index_lock:
+                self._refresh_index(None, None, 0)
+            return [], 0, 0
+        # The page is read from the same open file the index was refreshed from
+        with f:
+            with self._index_lock:
+                self._refresh_index(f, file_id, size)
+                total = len(self._offsets)
+                start = max(cursor, 0)
+                if since:
+                    start = max(start, bisect.bisect_right(self._timestamps, since))
+                start = min(start, total)
+                stop = total if limit is None else min(start + max(limit, 0), total)
+                if start == stop:
+                    return [], stop, total
+                begin = self._offsets[start]
+                finish = self._offsets[stop] if stop < total else self._indexed_size
+
+            f.seek(begin)
+            data = f.read(finish - begin)
+        entries = [json.loads(line) for line in data.splitlines() if line.strip()]
+        return entries, stop, total
+
+    def tail(self, position=None):
+        """
+        Returns (entries, position, reset): the complete entries appended after
+        `position` and the position to pass next time (None reads from the top).
+        A position records which file it belongs to, so reset is True when the
+        log was cleared since then, in which case entries start from the top.
+        """
+        f, file_id, size = self._open()
+        if f is None:
+            return [], None, position is not None
+        with f:
+            last_id, offset = position or (file_id, 0)
+            reset = last_id != file_id or size < offset
+            if reset:
+                offset = 0
+            if size == offset:
+                return [], (file_id, offset), reset
+            f.seek(offset)
+            data = f.read(size - offset)
+        end = data.rfind(b"\n") + 1
+        entries = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return entries, (file_id, offset + end), reset
+
+    def clear(self):
+        """Atomically replaces the log with an empty file."""
+        with self._lock, self._index_lock:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".food_log.", suffix=".tmp")
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+            self._offsets, self._timestamps = [], []
+            self._indexed_size = 0
+            self._file_id = None
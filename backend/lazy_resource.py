@@ -0,0 +1,67 @@
+import threading
+import time
+
+from metrics import get_logger
+
+log = get_logger("lazy_resource")
+
+
+class LazyResource:
+    """
+    A value that is created on first use instead of at import time.
+
+    `get()` runs the factory once, however many threads ask at the same time;
+    a failed factory is retried on the next `get()`. `warm_up()` starts the
+    creation in a background thread so the first request does not pay for it,
+    and `status()` reports progress for readiness checks.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self.state = "idle"  # idle -> loading -> ready, or failed
+        self.error = None
+        self.load_seconds = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self):
+        if self.state == "ready":
+            return self._value
+        with self._lock:
+            if self.state != "ready":
+                self.state = "loading"
+                started = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self.state, self.error = "failed", str(e)
+                    raise
+                self.load_seconds = round(time.perf_counter() - started, 3)
+                self.state, self.error = "ready", None
+                log.info("%s ready in %ss", self.name, self.load_seconds)
+        return self._value
+
+    def reset(self):
+        """Makes the next get() create a new value; the current one is returned until then."""
+        with self._lock:
+            self.state = "idle"
+
+    def warm_up(self):
+        """Creates the value in a daemon thread; failures are reported by status()."""
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                log.warning("Warm-up of %s failed: %s", self.name, e)
+
+        thread = threading.Thread(target=run, name=f"warm-up-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        return {"state": self.state, "error": self.error, "load_seconds": self.load_seconds}
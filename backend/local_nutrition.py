@@ -0,0 +1,240 @@
+import csv
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from nutrition_snapshot import open_snapshot, to_float
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Each source CSV is mapped onto the same fields the FoodNutrition collection
+# returns. Earlier sources win when two rows normalize to the same name.
+# "snapshot" gives the same mapping in the cleaned column names of the
+# dataset's columnar snapshot, which is used instead of the CSV when present.
+CSV_SOURCES = [
+    {
+        "path": os.path.join(DATA_DIR, "nutrition4.csv"),
+        "name": "Food Name",
+        "category": "Category Name",
+        "fields": {"calories": "Calories", "carbohydrate": "Carbs", "fat": "Fats", "protein": "Protein"},
+        "snapshot": {
+            "dataset": "nutrition4",
+            "name": "food_name",
+            "category": "category_name",
+            "fields": {"calories": "calories", "carbohydrate": "carbs", "fat": "fats", "protein": "protein"},
+        },
+    },
+    {
+        "path": os.path.join(DATA_DIR, "nutrition3.csv"),
+        "name": "Food",
+        "category": "Category",
+        "fields": {"calories": "Calories", "carbohydrate": "Carbs", "fat": "Fat", "protein": "Protein"},
+        "snapshot": {
+            "dataset": "nutrition3",
+            "name": "food",
+            "category": "category",
+            "fields": {"calories": "calories", "carbohydrate": "carbs", "fat": "fat", "protein": "protein"},
+        },
+    },
+    {
+        "path": os.path.join(DATA_DIR, "nutrition2.csv"),
+        "name": "food_and_serving",
+        "category": "food_type",
+        "fields": {
+            "calories": "calories",
+            "carbohydrate": "total_carbo_hydrate_g",
+            "fat": "total_fat_g",
+            "protein": "protein_g",
+        },
+        "snapshot": {
+            "dataset": "nutrition2",
+            "name": "food_and_serving",
+            "category": "food_type",
+            "fields": {
+                "calories": "calories",
+                "carbohydrate": "total_carbo_hydrate_g",
+                "fat": "total_fat_g",
+                "protein": "protein_g",
+            },
+        },
+    },
+]
+
+NUMERIC_FIELDS = ["calories", "carbohydrate", "fat", "protein"]
+
+NGRAM_SIZE = 3
+NGRAM_DIM = 1024  # hashed trigram buckets
+
+# Below this cosine similarity the caller should fall back to Weaviate
+DEFAULT_MIN_SCORE = float(os.getenv("LOCAL_NUTRITION_MIN_SCORE", "0.6"))
+
+
+def normalize_name(name: str) -> str:
+    """Lower-cases, strips punctuation and naively singularizes each word."""
+    words = re.sub(r"[^a-z0-9 ]+", " ", str(name).lower()).split()
+    singular = []
+    for word in words:
+        if len(word) > 4 and word.endswith("es") and word[-3] in "sxz":
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        singular.append(word)
+    return " ".join(singular)
+
+
+def _parse_number(value) -> float:
+    """Parses values like '1,419' and treats blanks and 't' (trace) as 0."""
+    value = str(value or "").replace(",", "").strip()
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def _join(parts):
+    # A single snapshot column is kept as its memory-mapped view
+    if len(parts) == 1:
+        return parts[0]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+
+def ngram_vector(text: str) -> np.ndarray:
+    padded = f" {text} "
+    vector = np.zeros(NGRAM_DIM, dtype=np.float32)
+    for i in range(len(padded) - NGRAM_SIZE + 1):
+        gram = padded[i:i + NGRAM_SIZE]
+        vector[zlib.crc32(gram.encode("utf-8")) % NGRAM_DIM] += 1.0
+    return vector
+
+
+class LocalNutritionEngine:
+    """
+    In-process nutrition lookup over the CSVs in data/.
+
+    The rows are held column-wise in float32 NumPy arrays, memory-mapped from
+    the columnar snapshots when they have been built and parsed from the CSVs
+    otherwise. Lookups try an exact match on the normalized name first and
+    otherwise score every row at once with a TF-IDF weighted character trigram
+    cosine similarity.
+    """
+
+    def __init__(self, sources=None, min_score=DEFAULT_MIN_SCORE):
+        self.min_score = min_score
+
+        names, categories = [], []
+        columns = {field: [] for field in NUMERIC_FIELDS}
+        for source in sources or CSV_SOURCES:
+            snapshot = open_snapshot(source["snapshot"]["dataset"]) if "snapshot" in source else None
+            if snapshot is not None:
+                self._load_snapshot(snapshot, source["snapshot"], names, categories, columns)
+            elif os.path.exists(source["path"]):
+                self._load_csv(source, names, categories, columns)
+
+        self.names = np.array(names, dtype=object)
+        self.categories = np.array(categories, dtype=object)
+        self.columns = {field: _join(parts) for field, parts in columns.items()}
+
+        self.normalized_names = [normalize_name(name) for name in names]
+        self.exact_index = {}
+        for i, name in enumerate(names):
+            self.exact_index.setdefault(name.lower(), i)
+        self.normalized_index = {}
+        for i, name in enumerate(self.normalized_names):
+            self.normalized_index.setdefault(name, i)
+
+        self._build_ngram_index()
+
+    @staticmethod
+    def _load_csv(source, names, categories, columns):
+        values = {field: [] for field in NUMERIC_FIELDS}
+        with open(source["path"], newline="", encoding="utf-8", errors="replace") as f:
+            for row in csv.DictReader(f):
+                # nutrition2 stores 'Banana, 1 medium (126 g/4.5 oz)'
+                name = (row.get(source["name"]) or "").split(",")[0].strip()
+                if not name:
+                    continue
+                names.append(name)
+                categories.append((row.get(source["category"]) or "").strip())
+                for field, column in source["fields"].items():
+                    values[field].append(_parse_number(row.get(column)))
+        for field, column in values.items():
+            columns[field].append(np.array(column, dtype=np.float32))
+
+    @staticmethod
+    def _load_snapshot(snapshot, mapping, names, categories, columns):
+        source_names = snapshot.text(mapping["name"])
+        source_categories = snapshot.text(mapping["category"])
+        keep = []
+        for i, name in enumerate(source_names):
+            name = name.split(",")[0].strip()
+            if name:
+                keep.append(i)
+                names.append(name)
+                categories.append(source_categories[i])
+        for field, column in mapping["fields"].items():
+            values = snapshot.numeric(column)
+            columns[field].append(values if len(keep) == len(values) else values[keep])
+
+    def _build_ngram_index(self):
+        counts = np.stack([ngram_vector(name) for name in self.normalized_names]) if self.normalized_names \
+            else np.zeros((0, NGRAM_DIM), dtype=np.float32)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = np.log((1.0 + len(counts)) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+        weighted = counts * self.idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.ngram_matrix = weighted / norms
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, food_name: str):
+        """Returns (row_index, score) for the best row, or (None, 0.0) if the table is empty."""
+        if not len(self.names):
+            return None, 0.0
+
+        index = self.exact_index.get(str(food_name).strip().lower())
+        if index is None:
+            index = self.normalized_index.get(normalize_name(food_name))
+        if index is not None:
+            return index, 1.0
+
+        query = ngram_vector(normalize_name(food_name)) * self.idf
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None, 0.0
+        scores = self.ngram_matrix @ (query / norm)
+        # Ties go to the shortest name, so 'banana' beats 'banana pudding'
+        best = np.flatnonzero(scores >= scores.max() - 1e-6)
+        index = min(best, key=lambda i: len(self.normalized_names[i]))
+        return int(index), float(scores[index])
+
+    def row(self, index: int) -> dict:
+        result = {"name": self.names[index]}
+        for field in NUMERIC_FIELDS:
+            result[field] = to_float(self.columns[field][index])
+        return result
+
+    def get_nutrition_info(self, food_name: str, min_score=None):
+        """Returns the same shape as weaviate_client.get_nutrition_info, or None below the threshold."""
+        index, score = self.match(food_name)
+        if index is None or score < (self.min_score if min_score is None else min_score):
+            return None
+        return self.row(index)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_local_engine() -> LocalNutritionEngine:
+    """Loads the engine once per process on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = LocalNutritionEngine()
+    return _engine
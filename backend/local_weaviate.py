@@ -0,0 +1,567 @@
+"""
+In-process stand-in for Weaviate Cloud and Gemini, so the nutrition API, the
+search services, the importer and the benchmarks run without network access.
+
+With WEAVIATE_BACKEND=local every client the backend creates
+(weviate_connect, weaviate_client and the import pipeline) talks to one
+in-memory store per process, seeded on first use from data/nutrition*.csv:
+FoodNutrition holds the rows local_nutrition serves (name, category,
+calories, carbohydrate, fat, protein) and FoodNutrition2-4 hold the CSVs
+cleaned exactly as Import_Scripts/import_pipeline.py uploads them.
+
+Only the surfaces the backend uses are implemented: collections
+exists/get/create/delete, alias get/create/update/delete, and on a
+collection query.near_text, generate.near_text, iterator, config.get,
+data.insert/delete_many and batch.fixed_size/dynamic. near_text ranks objects
+by the cosine distance of hashed character trigram vectors of their text
+properties, and generate.near_text summarizes the best matches instead of
+calling Gemini.
+
+Environment (milliseconds; every call sleeps base * (1 +/- jitter)):
+  WEAVIATE_BACKEND             cloud (default) or local
+  LOCAL_WEAVIATE_QUERY_MS      near_text retrieval (default 25)
+  LOCAL_WEAVIATE_GENERATE_MS   generative near_text (default 600)
+  LOCAL_WEAVIATE_BATCH_MS      one batch request (default 40)
+  LOCAL_WEAVIATE_JITTER        relative jitter (default 0.25)
+"""
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+import uuid as uuid_module
+
+import numpy as np
+import weaviate
+
+from local_nutrition import NGRAM_DIM, NUMERIC_FIELDS, get_local_engine, ngram_vector, normalize_name
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+NOT_FOUND_SUMMARY = "I cannot find that specific information in this particular database."
+
+
+def local_mode() -> bool:
+    """True when WEAVIATE_BACKEND=local; read on every call so tools can switch it before connecting."""
+    return os.environ.get("WEAVIATE_BACKEND", "cloud").lower() == "local"
+
+
+class Latency:
+    """Injected latency per call type, in milliseconds."""
+
+    def __init__(self, query_ms=25.0, generate_ms=600.0, batch_ms=40.0, jitter=0.25):
+        self.query_ms = query_ms
+        self.generate_ms = generate_ms
+        self.batch_ms = batch_ms
+        self.jitter = jitter
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            query_ms=float(os.environ.get("LOCAL_WEAVIATE_QUERY_MS", "25")),
+            generate_ms=float(os.environ.get("LOCAL_WEAVIATE_GENERATE_MS", "600")),
+            batch_ms=float(os.environ.get("LOCAL_WEAVIATE_BATCH_MS", "40")),
+            jitter=float(os.environ.get("LOCAL_WEAVIATE_JITTER", "0.25")),
+        )
+
+    def seconds(self, ms) -> float:
+        return max(0.0, ms * (1 + random.uniform(-self.jitter, self.jitter))) / 1000
+
+    def to_dict(self):
+        return {"query_ms": self.query_ms, "generate_ms": self.generate_ms,
+                "batch_ms": self.batch_ms, "jitter": self.jitter}
+
+
+# --- Shapes returned to callers (the attributes the backend reads) ---
+
+class PropertyConfig:
+    def __init__(self, name, data_type, skip_vectorization=False):
+        self.name = name
+        self.data_type = getattr(data_type, "value", data_type) # DataType.NUMBER -> "number"
+        self.skip_vectorization = skip_vectorization
+
+
+class Metadata:
+    def __init__(self, distance=None):
+        self.distance = distance
+
+
+class Object:
+    def __init__(self, uuid, properties, distance=None, vector=None):
+        self.uuid = uuid
+        self.properties = properties
+        self.metadata = Metadata(distance)
+        self.vector = vector
+
+
+class QueryReturn:
+    def __init__(self, objects, generated=None):
+        self.objects = objects
+        self.generated = generated
+
+
+class FailedObject:
+    def __init__(self, message, obj):
+        self.message = message
+        self.object_ = obj
+
+
+class AliasReturn:
+    def __init__(self, alias, collection):
+        self.alias = alias
+        self.collection = collection
+
+
+def embed(text: str) -> np.ndarray:
+    vector = ngram_vector(normalize_name(text))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _summarize(collection_name, objects):
+    """Stands in for Gemini's grouped answer: the best matches with their numeric fields."""
+    if not objects:
+        return NOT_FOUND_SUMMARY
+    lines = []
+    for obj in objects[:3]:
+        label = next((value for value in obj.properties.values() if isinstance(value, str) and value), "item")
+        facts = [f"{name.replace('_', ' ')} {value:g}" for name, value in obj.properties.items()
+                 if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        lines.append(f"{label}: {', '.join(facts[:6])}")
+    return f"From {collection_name}: " + "; ".join(lines)
+
+
+class StoredCollection:
+    """One collection's objects and their vectors, with a search matrix rebuilt after writes."""
+
+    def __init__(self, name, properties):
+        self.name = name
+        self.properties = list(properties)
+        self.objects = {} # uuid -> (properties, vector)
+        self._index = None
+
+    def _vectorized_text(self, properties):
+        skipped = {prop.name for prop in self.properties if prop.skip_vectorization}
+        return " ".join(str(value) for name, value in properties.items()
+                        if isinstance(value, str) and name not in skipped)
+
+    def validate(self, properties):
+        numbers = {prop.name for prop in self.properties if prop.data_type == "number"}
+        for name in numbers:
+            value = properties.get(name)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                return f"invalid number property '{name}': {value!r}"
+        return None
+
+    def put(self, uuid, properties, vector=None):
+        if vector is None or len(vector) != NGRAM_DIM:
+            vector = embed(self._vectorized_text(properties))
+        self.objects[str(uuid)] = (dict(properties), np.asarray(vector, dtype=np.float32))
+        self._index = None
+
+    def delete(self, uuids):
+        removed = 0
+        for uuid in uuids:
+            removed += self.objects.pop(str(uuid), None) is not None
+        if removed:
+            self._index = None
+        return removed
+
+    def index(self):
+        if self._index is None:
+            uuids = list(self.objects)
+            matrix = np.stack([self.objects[uuid][1] for uuid in uuids]) if uuids \
+                else np.zeros((0, NGRAM_DIM), dtype=np.float32)
+            self._index = (uuids, matrix)
+        return self._index
+
+
+class LocalWeaviate:
+    """The shared in-memory store behind every local client in this process."""
+
+    def __init__(self, latency=None):
+        self.latency = latency or Latency.from_env()
+        self.collections = {}
+        self.aliases = {}
+        self.calls = {"near_text": 0, "generate": 0, "batch_requests": 0, "objects_written": 0}
+        self._lock = threading.RLock()
+
+    def resolve(self, name):
+        with self._lock:
+            target = self.aliases.get(name, name)
+            collection = self.collections.get(target)
+        if collection is None:
+            raise weaviate.exceptions.WeaviateQueryError(f"Collection '{name}' not found", "local")
+        return collection
+
+    def create(self, name, properties):
+        with self._lock:
+            if name in self.collections:
+                raise ValueError(f"Collection '{name}' already exists")
+            self.collections[name] = StoredCollection(name, properties)
+            return self.collections[name]
+
+    def near_text(self, name, query, limit, return_properties=None):
+        collection = self.resolve(name)
+        with self._lock:
+            uuids, matrix = collection.index()
+            objects = collection.objects
+            if not uuids:
+                return []
+            distances = 1.0 - matrix @ embed(query)
+            best = np.argsort(distances, kind="stable")[:limit]
+            results = []
+            for i in best:
+                properties, _ = objects[uuids[i]]
+                if return_properties is not None:
+                    properties = {key: properties[key] for key in return_properties if key in properties}
+                results.append(Object(uuid_module.UUID(uuids[i]), dict(properties), float(distances[i])))
+        return results
+
+    def write(self, name, objects):
+        """Stores (uuid, properties, vector) triples as one batch request; returns the FailedObjects."""
+        collection = self.resolve(name)
+        failed = []
+        with self._lock:
+            for obj in objects:
+                error = collection.validate(obj.properties)
+                if error:
+                    failed.append(FailedObject(error, obj))
+                else:
+                    collection.put(obj.uuid, obj.properties, obj.vector)
+            self.calls["batch_requests"] += 1
+            self.calls["objects_written"] += len(objects) - len(failed)
+        return failed
+
+    def count(self, call):
+        with self._lock:
+            self.calls[call] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "collections": {name: len(collection.objects) for name, collection in self.collections.items()},
+                "aliases": dict(self.aliases),
+                "latency": self.latency.to_dict(),
+            }
+
+
+# --- Client surfaces ---
+
+class _BatchObject:
+    def __init__(self, uuid, properties, vector):
+        self.uuid = uuid
+        self.properties = properties
+        self.vector = vector
+
+
+class _Batch:
+    """
+    Buffers objects and stores them batch_size at a time. Each full batch
+    costs one injected batch latency divided by concurrent_requests, which
+    approximates the real client keeping that many requests in flight.
+    """
+
+    def __init__(self, manager, batch_size, concurrent_requests):
+        self._manager = manager
+        self._batch_size = batch_size
+        self._concurrency = max(1, concurrent_requests)
+        self._buffer = []
+        self._failed = []
+
+    def __enter__(self):
+        self._manager.failed_objects = []
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        self._manager.failed_objects = self._failed
+        return False
+
+    @property
+    def number_errors(self):
+        return len(self._failed)
+
+    def add_object(self, properties=None, uuid=None, vector=None, references=None):
+        uuid = str(uuid or uuid_module.uuid4())
+        self._buffer.append(_BatchObject(uuid, dict(properties or {}), vector))
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+        return uuid
+
+    def flush(self):
+        if not self._buffer:
+            return
+        store = self._manager.store
+        time.sleep(store.latency.seconds(store.latency.batch_ms) / self._concurrency)
+        self._failed.extend(store.write(self._manager.name, self._buffer))
+        self._buffer = []
+
+
+class _BatchManager:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.failed_objects = []
+
+    def fixed_size(self, batch_size=100, concurrent_requests=2):
+        return _Batch(self, batch_size, concurrent_requests)
+
+    def dynamic(self):
+        return _Batch(self, 100, 2)
+
+
+class _Query:
+    def __init__(self, store, name):
+        self._store = store
+        self._name = name
+
+    def _near_text(self, query, limit, return_properties):
+        self._store.count("near_text")
+        return QueryReturn(self._store.near_text(self._name, query, limit, return_properties))
+
+    def near_text(self, query, limit=10, return_properties=None, return_metadata=None, **kwargs):
+        time.sleep(self._store.latency.seconds(self._store.latency.query_ms))
+        return self._near_text(query, limit, return_properties)
+
+
+class _Generate(_Query):
+    def _near_text(self, query, limit, return_properties):
+        self._store.count("generate")
+        objects = self._store.near_text(self._name, query, limit, return_properties)
+        return QueryReturn(objects, generated=_summarize(self._name, objects))
+
+    def near_text(self, query, limit=10, grouped_task=None, single_prompt=None,
+                  return_properties=None, **kwargs):
+        time.sleep(self._store.latency.seconds(self._store.latency.generate_ms))
+        return self._near_text(query, limit, return_properties)
+
+
+class _AsyncQuery(_Query):
+    async def near_text(self, query, limit=10, return_properties=None, return_metadata=None, **kwargs):
+        await asyncio.sleep(self._store.latency.seconds(self._store.latency.query_ms))
+        return self._near_text(query, limit, return_properties)
+
+
+class _AsyncGenerate(_Generate):
+    async def near_text(self, query, limit=10, grouped_task=None, single_prompt=None,
+                        return_properties=None, **kwargs):
+        await asyncio.sleep(self._store.latency.seconds(self._store.latency.generate_ms))
+        return self._near_text(query, limit, return_properties)
+
+
+class _Data:
+    def __init__(self, store, name):
+        self._store = store
+        self._name = name
+
+    def insert(self, properties, uuid=None, vector=None):
+        uuid = str(uuid or uuid_module.uuid4())
+        failed = self._store.write(self._name, [_BatchObject(uuid, dict(properties), vector)])
+        if failed:
+            raise ValueError(failed[0].message)
+        return uuid_module.UUID(uuid)
+
+    def delete_many(self, where):
+        # Only the Filter.by_id().contains_any([...]) filters the importer sends are supported
+        if getattr(where, "target", None) != "_id":
+            raise NotImplementedError("The local Weaviate stand-in only deletes by id")
+        collection = self._store.resolve(self._name)
+        with self._store._lock:
+            return collection.delete(where.value)
+
+
+class _Config:
+    def __init__(self, store, name):
+        self._store = store
+        self._name = name
+
+    def get(self):
+        collection = self._store.resolve(self._name)
+        return CollectionConfig(collection.name, collection.properties)
+
+
+class CollectionConfig:
+    def __init__(self, name, properties):
+        self.name = name
+        self.properties = properties
+
+
+class LocalCollection:
+    """Handle returned by collections.get(); the name is resolved through aliases on every call."""
+
+    query_class = _Query
+    generate_class = _Generate
+
+    def __init__(self, store, name):
+        self.name = name
+        self._store = store
+        self.query = self.query_class(store, name)
+        self.generate = self.generate_class(store, name)
+        self.batch = _BatchManager(store, name)
+        self.data = _Data(store, name)
+        self.config = _Config(store, name)
+
+    def iterator(self, include_vector=False, return_properties=None):
+        collection = self._store.resolve(self.name)
+        with self._store._lock:
+            items = list(collection.objects.items())
+        for uuid, (properties, vector) in items:
+            if return_properties is not None:
+                properties = {key: properties[key] for key in return_properties if key in properties}
+            yield Object(uuid_module.UUID(uuid), dict(properties),
+                         vector={"default": vector.tolist()} if include_vector else None)
+
+
+class AsyncLocalCollection(LocalCollection):
+    query_class = _AsyncQuery
+    generate_class = _AsyncGenerate
+
+
+class _Collections:
+    def __init__(self, store, collection_class):
+        self._store = store
+        self._collection_class = collection_class
+
+    def exists(self, name):
+        with self._store._lock:
+            return name in self._store.collections
+
+    def get(self, name):
+        return self._collection_class(self._store, name)
+
+    def create(self, name, properties=None, **kwargs):
+        configs = [PropertyConfig(prop.name, prop.dataType, bool(prop.skip_vectorization))
+                   for prop in properties or []]
+        self._store.create(name, configs)
+        return self.get(name)
+
+    def delete(self, name):
+        with self._store._lock:
+            for item in [name] if isinstance(name, str) else name:
+                self._store.collections.pop(item, None)
+
+
+class _Aliases:
+    def __init__(self, store):
+        self._store = store
+
+    def get(self, alias_name):
+        with self._store._lock:
+            target = self._store.aliases.get(alias_name)
+        return AliasReturn(alias_name, target) if target else None
+
+    def create(self, alias_name, target_collection):
+        with self._store._lock:
+            if alias_name in self._store.aliases or alias_name in self._store.collections:
+                raise ValueError(f"'{alias_name}' is already in use")
+            self._store.aliases[alias_name] = target_collection
+
+    def update(self, alias_name, new_target_collection):
+        with self._store._lock:
+            self._store.aliases[alias_name] = new_target_collection
+
+    def delete(self, alias_name):
+        with self._store._lock:
+            return self._store.aliases.pop(alias_name, None) is not None
+
+
+class LocalClient:
+    """Synchronous client, standing in for weaviate.connect_to_weaviate_cloud()."""
+
+    def __init__(self, store):
+        self.store = store
+        self.collections = _Collections(store, LocalCollection)
+        self.alias = _Aliases(store)
+
+    def connect(self):
+        pass
+
+    def is_ready(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class AsyncLocalClient:
+    """Async client, standing in for weaviate.use_async_with_weaviate_cloud()."""
+
+    def __init__(self, store):
+        self.store = store
+        self.collections = _Collections(store, AsyncLocalCollection)
+        self.alias = _Aliases(store)
+
+    async def connect(self):
+        pass
+
+    async def is_ready(self):
+        return True
+
+    async def close(self):
+        pass
+
+
+# --- Seeding ---
+
+def _seed_food_nutrition(store):
+    """FoodNutrition, in the shape weaviate_client queries, from the rows local_nutrition loads."""
+    engine = get_local_engine()
+    collection = store.create("FoodNutrition", [PropertyConfig("name", "text"), PropertyConfig("category", "text")]
+                              + [PropertyConfig(field, "number") for field in NUMERIC_FIELDS])
+    for i in range(len(engine)):
+        row = engine.row(i)
+        row["category"] = str(engine.categories[i])
+        collection.put(uuid_module.uuid5(uuid_module.NAMESPACE_URL, f"FoodNutrition/{i}"), row)
+
+
+def _seed_datasets(store):
+    """The other collections exactly as the import pipeline would upload them."""
+    sys.path.append(os.path.join(BACKEND_DIR, "Import_Scripts"))
+    from datasets import DATASETS
+    from import_pipeline import HASH_PROPERTY, ChunkCleaner, content_hash, iter_record_chunks, row_identity
+
+    for dataset in DATASETS.values():
+        csv_path = os.path.join(BACKEND_DIR, dataset["csv"])
+        if not os.path.exists(csv_path) or dataset["collection"] in store.collections:
+            continue
+        cleaner = ChunkCleaner(dataset)
+        seen, collection = {}, None
+        for records in iter_record_chunks(csv_path, cleaner, 1000):
+            if collection is None:
+                properties = [PropertyConfig(name, data_type) for name, data_type in cleaner.data_types.items()]
+                collection = store.create(dataset["collection"], properties + [PropertyConfig(HASH_PROPERTY, "text", True)])
+            for record in records:
+                uuid = row_identity(record, dataset["key_columns"], seen)
+                record[HASH_PROPERTY] = content_hash(record)
+                collection.put(uuid, record)
+
+
+def seed_store(store):
+    _seed_food_nutrition(store)
+    _seed_datasets(store)
+    return store
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_local_store() -> LocalWeaviate:
+    """Creates and seeds the process-wide store on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = seed_store(LocalWeaviate())
+    return _store
+
+
+def connect_local() -> LocalClient:
+    return LocalClient(get_local_store())
+
+
+def use_async_local() -> AsyncLocalClient:
+    return AsyncLocalClient(get_local_store())
@@ -1,52 +1,72 @@
+import asyncio
 from fastapi import FastAPI
-from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
-from weaviate_client import get_nutrition_info, create_weaviate_client
-import json
-import os
-
-app = FastAPI()
+import weaviate_client
+from weaviate_client import WeaviateConnection, get_nutrition_infos
+from local_nutrition import get_local_engine
+from nutrition_cache import nutrition_cache
+from food_log_store import FoodLogStore
+from nutrition_totals import NutritionTotals
+from metrics import install_fastapi
 
 sample_food = 'banana'
 
+food_log = FoodLogStore()
+
+# Running totals, updated from the entries appended since the last request
+nutrition_totals = NutritionTotals(food_log, get_nutrition_infos)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    client = create_weaviate_client()
-    app.state.weaviate_client = client
+    connection = WeaviateConnection()
+    await connection.start()
+    weaviate_client.set_connection(connection)
+    app.state.weaviate = connection
+    if weaviate_client.LOCAL_NUTRITION_ENABLED:
+        await asyncio.to_thread(get_local_engine) # build the local index before the first request
 
     yield
 
-    client.close()
+    await connection.close()
+
+app = FastAPI(lifespan=lifespan)
+install_fastapi(app, "nutrition_api") # /metrics and request timing
 
 @app.get("/")
-def root():
+async def root():
     return {"Hello":"World"}
 
+@app.get("/health")
+async def health():
+    return app.state.weaviate.status()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return nutrition_cache.stats()
+
 @app.get("/food")
-def get_nutrition():
+async def get_nutrition():
 
     try:
-        with open("../food_logs.json", "r") as f:
-            data = json.load(f)
+        data = await asyncio.to_thread(food_log.read_all)
 
-            final_output = []
+        # Resolve each distinct food once, then fan back out in log order
+        foods = [info["food"] for info in data]
+        nutrition_by_food = await get_nutrition_infos(foods)
 
-            for info in data:
-                food = info["food"]
-                result = get_nutrition_info(food)
-                final_output.append(result)
+        final_output = [nutrition_by_food[food] for food in foods]
 
 
         return final_output
     except Exception as e:
         return {"error": str(e)}
 
-
-
     
 
-
-
-
-
-
+@app.get("/food/totals")
+async def get_nutrition_totals(date: str = None, days: int = 7):
+    """Calorie, carbohydrate, fat and protein totals for a day (default today) by hour and food, plus the last `days` days"""
+    try:
+        return await nutrition_totals.summary(day=date, days=max(1, min(days, 366)))
+    except Exception as e:
+        return {"error": str(e)}
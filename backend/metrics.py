@@ -0,0 +1,317 @@
+"""
+Shared instrumentation for the NutriScan services: Prometheus-style counters
+and latency histograms rendered on /metrics, sampled per-request span traces,
+and leveled, rate-limited logging.
+
+    from metrics import Histogram, get_logger, span
+
+    QUERY_SECONDS = Histogram("nutriscan_weaviate_seconds", "Weaviate call latency", ["operation"])
+    with QUERY_SECONDS.time(operation="near_text"), span("near_text"):
+        ...
+
+Environment:
+  LOG_LEVEL             DEBUG, INFO (default), WARNING, ...
+  LOG_RATE_LIMIT        messages per call site per LOG_RATE_INTERVAL seconds (default 10 per 10s)
+  TRACE_SAMPLE_RATE     fraction of requests whose span timings are logged (default 0)
+"""
+import bisect
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond cache hits up to slow generative calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """A value read from `getter()` when /metrics is scraped."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, getter):
+        super().__init__(name, documentation)
+        self.getter = getter
+
+    def _samples(self):
+        try:
+            return [f"{self.name} {float(self.getter())}"]
+        except Exception:
+            return []
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        lines = []
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics shared by the services ---
+
+REQUEST_SECONDS = Histogram("nutriscan_request_seconds", "HTTP request latency", ["service", "endpoint", "status"])
+ERRORS = Counter("nutriscan_errors_total", "Errors by component", ["component"])
+CACHE_REQUESTS = Counter("nutriscan_cache_requests_total", "Nutrition cache lookups", ["result"])
+WEAVIATE_SECONDS = Histogram("nutriscan_weaviate_seconds", "Weaviate call latency", ["operation", "collection"])
+INFERENCE_SECONDS = Histogram("nutriscan_inference_seconds", "YOLO inference latency per batch", ["profile"])
+LOG_WRITE_SECONDS = Histogram("nutriscan_food_log_write_seconds", "Food log append latency (including fsync)")
+SERIALIZE_SECONDS = Histogram("nutriscan_json_serialize_seconds", "JSON serialization latency", ["endpoint"])
+SPAN_SECONDS = Histogram("nutriscan_span_seconds", "Latency of traced stages", ["span"])
+
+
+# --- Sampled per-request tracing ---
+
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+_current_trace = contextvars.ContextVar("nutriscan_trace", default=None)
+
+
+@contextmanager
+def trace(name, sample_rate=None):
+    """
+    Starts a trace for one request. A sampled trace collects the spans opened
+    inside it and logs their timings when the request ends.
+    """
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate:
+        yield None
+        return
+    spans = []
+    token = _current_trace.set(spans)
+    started = time.perf_counter()
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+        total = (time.perf_counter() - started) * 1000
+        timings = ", ".join(f"{span_name}={ms:.1f}ms" for span_name, ms in spans)
+        _trace_log.info("trace %s %.1fms [%s]", name, total, timings)
+
+
+@contextmanager
+def span(name):
+    """Times one stage into nutriscan_span_seconds and into the current sampled trace, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        SPAN_SECONDS.observe(elapsed, span=name)
+        spans = _current_trace.get()
+        if spans is not None:
+            spans.append((name, elapsed * 1000))
+
+
+# --- Leveled, rate-limited logging ---
+
+LOG_RATE_LIMIT = int(os.environ.get("LOG_RATE_LIMIT", "10"))
+LOG_RATE_INTERVAL = float(os.environ.get("LOG_RATE_INTERVAL", "10"))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `limit` records per call site through every `interval`
+    seconds and reports how many were dropped on the next one let through.
+    """
+
+    def __init__(self, limit=LOG_RATE_LIMIT, interval=LOG_RATE_INTERVAL):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self._windows = {}  # (path, line) -> [window_start, emitted, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+            if window[1] >= self.limit:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+
+_logging_configured = False
+
+
+def get_logger(name):
+    """
+    Logger under the 'nutriscan' namespace. Use %-style arguments
+    (log.debug("found %s", item)) so disabled levels skip the formatting.
+    """
+    global _logging_configured
+    root = logging.getLogger("nutriscan")
+    if not _logging_configured:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[%(name)s] %(levelname)s %(message)s"))
+        handler.addFilter(RateLimitFilter())
+        root.addHandler(handler)
+        root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+        _logging_configured = True
+    return root.getChild(name)
+
+
+_trace_log = get_logger("trace")
+
+
+# --- Framework hooks ---
+
+def install_flask(app, service):
+    """Adds /metrics and per-request latency, error counting and sampled tracing to a Flask app."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request():
+        g.metrics_started = time.perf_counter()
+        g.metrics_trace = trace(f"{request.method} {request.path}")
+        g.metrics_trace.__enter__()
+
+    @app.after_request
+    def _finish_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                    service=service, endpoint=endpoint, status=response.status_code)
+            if response.status_code >= 500:
+                ERRORS.inc(component=service)
+        return response
+
+    @app.teardown_request
+    def _end_trace(exc):
+        active = g.pop("metrics_trace", None)
+        if active is not None:
+            active.__exit__(None, None, None)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+def install_fastapi(app, service):
+    """Adds /metrics and per-request latency, error counting and sampled tracing to a FastAPI app."""
+    from fastapi import Request
+    from fastapi.responses import PlainTextResponse
+
+    @app.middleware("http")
+    async def _measure(request: Request, call_next):
+        started = time.perf_counter()
+        with trace(f"{request.method} {request.url.path}"):
+            response = await call_next(request)
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(time.perf_counter() - started, service=service,
+                                endpoint=route.path if route else "unmatched", status=response.status_code)
+        if response.status_code >= 500:
+            ERRORS.inc(component=service)
+        return response
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
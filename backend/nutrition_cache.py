@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import CACHE_REQUESTS
+from single_flight import SingleFlight
+
+# Import scripts touch a stamp file per collection after uploading, so every
+# process holding cached results can tell that a collection was re-imported.
+IMPORT_STAMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", ".imports")
+
+
+def normalize_food_name(food_name: str) -> str:
+    """Lower-cases and collapses whitespace so 'Banana ' and 'banana' share an entry."""
+    return " ".join(str(food_name).lower().split())
+
+
+def _stamp_path(collection: str) -> str:
+    return os.path.join(IMPORT_STAMP_DIR, f"{collection}.stamp")
+
+
+def mark_collection_imported(collection: str):
+    """
+    Records that a collection has just been (re-)imported. Called by the import
+    scripts once an upload finishes; cached lookups against the collection are
+    dropped the next time any process checks the stamp.
+    """
+    os.makedirs(IMPORT_STAMP_DIR, exist_ok=True)
+    with open(_stamp_path(collection), "w") as f:
+        f.write(str(time.time()))
+
+
+def _read_stamp(collection: str) -> float:
+    try:
+        return os.path.getmtime(_stamp_path(collection))
+    except OSError:
+        return 0.0
+
+
+class NutritionCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL for nutrition lookups.
+
+    Entries are keyed on (collections, normalized food name). Import stamps are
+    checked at most once every `stamp_check_interval` seconds per collection so
+    a hit stays a dictionary lookup. Concurrent misses for the same key share a
+    single load.
+    """
+
+    def __init__(self, maxsize=2048, ttl=6 * 60 * 60, stamp_check_interval=1.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stamp_check_interval = stamp_check_interval
+
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._stamps = {}  # collection -> (stamp, checked_at)
+        self._flights = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(collections, food_name):
+        if isinstance(collections, str):
+            collections = (collections,)
+        return (tuple(collections), normalize_food_name(food_name))
+
+    def _check_stamps(self, collections, now):
+        """Drops every entry for a collection whose import stamp has moved."""
+        for collection in collections:
+            stamp, checked_at = self._stamps.get(collection, (None, 0.0))
+            if now - checked_at < self.stamp_check_interval:
+                continue
+            current = _read_stamp(collection)
+            self._stamps[collection] = (current, now)
+            if stamp is not None and current != stamp:
+                self._invalidate_locked(collection)
+
+    def _invalidate_locked(self, collection=None):
+        if collection is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            stale = [key for key in self._entries if collection in key[0]]
+            for key in stale:
+                del self._entries[key]
+            removed = len(stale)
+        self.invalidations += removed
+
+    def get(self, collections, food_name):
+        """Returns (found, value). `value` may legitimately be None."""
+        key = self.make_key(collections, food_name)
+        now = time.monotonic()
+        with self._lock:
+            self._check_stamps(key[0], now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(result="miss")
+                return False, None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                CACHE_REQUESTS.inc(result="expired")
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            CACHE_REQUESTS.inc(result="hit")
+            return True, value
+
+    def set(self, collections, food_name, value, ttl=None):
+        key = self.make_key(collections, food_name)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, collections, food_name, loader, cache_none=True, none_ttl=None):
+        """
+        Returns the cached value for the key, calling `loader()` on a miss.
+        Concurrent misses for the same key wait for one `loader()` call.
+        When `cache_none` is False a None result is returned but not stored,
+        unless `none_ttl` is given: then it is stored for that many seconds.
+        """
+        found, value = self.get(collections, food_name)
+        if found:
+            return value
+
+        def load():
+            value = loader()
+            if value is not None or cache_none:
+                self.set(collections, food_name, value)
+            elif none_ttl:
+                self.set(collections, food_name, value, ttl=none_ttl)
+            return value
+
+        return self._flights.do(self.make_key(collections, food_name), load)
+
+    def invalidate(self, collection=None):
+        """Drops all entries, or only those that touch `collection`."""
+        with self._lock:
+            self._invalidate_locked(collection)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "coalesced": self._flights.coalesced,
+            }
+
+
+# Shared instance used by weaviate_client.py and search_scripts/nutrition_search.py
+nutrition_cache = NutritionCache(
+    maxsize=int(os.getenv("NUTRITION_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("NUTRITION_CACHE_TTL", str(6 * 60 * 60))),
+)
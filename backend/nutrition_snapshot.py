@@ -0,0 +1,185 @@
+"""
+Columnar snapshots of the cleaned nutrition CSVs.
+
+Each build of a dataset is written by Import_Scripts/build_snapshot.py to a
+fresh version directory, data/snapshots/<dataset>/<version>/, and published by
+atomically replacing data/snapshots/<dataset>/CURRENT, which names it:
+
+  schema.json      format version, source CSV size/mtime and column names
+  numeric.npy      float32 (numeric columns x rows), one contiguous column per row
+  text_index.npy   int32 (text columns x rows), indices into the string table
+  string_offsets.npy, strings.bin
+                   deduplicated UTF-8 string table
+
+Everything is memory-mapped on open, so loading a snapshot costs a few
+milliseconds regardless of its size and the pages are shared between processes.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from metrics import get_logger
+
+log = get_logger("nutrition_snapshot")
+
+SNAPSHOT_FORMAT = "nutriscan-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "snapshots")
+
+
+def snapshot_path(dataset: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, dataset)
+
+
+def current_version(dataset: str):
+    """Name of the dataset's published version directory, or None."""
+    try:
+        with open(os.path.join(snapshot_path(dataset), "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def source_signature(csv_path: str) -> dict:
+    stat = os.stat(csv_path)
+    return {"source_size": stat.st_size, "source_mtime": stat.st_mtime}
+
+
+def write_snapshot(dataset, source_csv, numeric, text):
+    """
+    Writes one dataset. numeric maps column -> float array, text maps
+    column -> list of str; all columns must have the same number of rows.
+    """
+    root = snapshot_path(dataset)
+    os.makedirs(root, exist_ok=True)
+    rows = len(next(iter(numeric.values() or text.values()), []))
+
+    values = np.zeros((len(numeric), rows), dtype=np.float32)
+    for i, column in enumerate(numeric.values()):
+        values[i] = column
+
+    strings, lookup = [], {}
+    index = np.zeros((len(text), rows), dtype=np.int32)
+    for i, column in enumerate(text.values()):
+        for row, value in enumerate(column):
+            if value not in lookup:
+                lookup[value] = len(strings)
+                strings.append(value)
+            index[i, row] = lookup[value]
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+    schema = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "dataset": dataset,
+        "source_csv": os.path.abspath(source_csv),
+        **source_signature(source_csv),
+        "rows": rows,
+        "numeric_columns": list(numeric),
+        "text_columns": list(text),
+    }
+
+    # The files go into a new version directory that no reader knows about yet; replacing
+    # CURRENT publishes all of them at once, and readers that already opened the old
+    # version keep their mappings
+    previous = current_version(dataset)
+    path = tempfile.mkdtemp(prefix="v", dir=root)
+    os.chmod(path, 0o755)
+    files = [
+        ("numeric.npy", lambda f: np.save(f, values)),
+        ("text_index.npy", lambda f: np.save(f, index)),
+        ("string_offsets.npy", lambda f: np.save(f, offsets)),
+        ("strings.bin", lambda f: f.write(b"".join(encoded))),
+        ("schema.json", lambda f: f.write(json.dumps(schema, indent=2).encode("utf-8"))),
+    ]
+    for name, write in files:
+        with open(os.path.join(path, name), "wb") as f:
+            write(f)
+    fd, pointer = tempfile.mkstemp(prefix="CURRENT.", dir=root)
+    with os.fdopen(fd, "w") as f:
+        f.write(os.path.basename(path))
+    os.chmod(pointer, 0o644)
+    os.replace(pointer, os.path.join(root, "CURRENT"))
+
+    # Keep the version just replaced for readers that are still opening it; drop older ones
+    keep = {os.path.basename(path), previous, "CURRENT"}
+    for name in os.listdir(root):
+        if name not in keep and not name.startswith("CURRENT."):
+            target = os.path.join(root, name)
+            if os.path.isdir(target):
+                shutil.rmtree(target, ignore_errors=True)
+            else:
+                os.remove(target) # files of the old unversioned layout
+    return schema
+
+
+class NutritionSnapshot:
+    """Read-only, memory-mapped view of one dataset snapshot."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "schema.json")) as f:
+            self.schema = json.load(f)
+        if self.schema.get("format") != SNAPSHOT_FORMAT or self.schema.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot format in {path}")
+
+        self.numeric_columns = self.schema["numeric_columns"]
+        self.text_columns = self.schema["text_columns"]
+        self._numeric = np.load(os.path.join(path, "numeric.npy"), mmap_mode="r")
+        self._text_index = np.load(os.path.join(path, "text_index.npy"), mmap_mode="r")
+        self._offsets = np.load(os.path.join(path, "string_offsets.npy"), mmap_mode="r")
+        strings_path = os.path.join(path, "strings.bin")
+        self._strings = np.memmap(strings_path, dtype=np.uint8, mode="r") if os.path.getsize(strings_path) \
+            else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return self.schema["rows"]
+
+    def is_stale(self) -> bool:
+        """True when the source CSV changed after the snapshot was built."""
+        try:
+            current = source_signature(self.schema["source_csv"])
+        except OSError:
+            return False # source not shipped alongside the snapshot
+        return any(self.schema[key] != value for key, value in current.items())
+
+    def numeric(self, column: str) -> np.ndarray:
+        """Zero-copy float32 view of one numeric column."""
+        return self._numeric[self.numeric_columns.index(column)]
+
+    def string(self, i: int) -> str:
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return self._strings[start:end].tobytes().decode("utf-8")
+
+    def text(self, column: str) -> list:
+        """Decodes one text column; repeated values share a single decoded string."""
+        index = self._text_index[self.text_columns.index(column)]
+        unique, inverse = np.unique(index, return_inverse=True)
+        decoded = [self.string(int(i)) for i in unique]
+        return [decoded[i] for i in inverse]
+
+
+def open_snapshot(dataset: str):
+    """Returns the dataset's published snapshot, or None when it is missing, unreadable or stale."""
+    version = current_version(dataset)
+    if version is None:
+        return None
+    path = os.path.join(snapshot_path(dataset), version)
+    try:
+        snapshot = NutritionSnapshot(path)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring snapshot '%s': %s", dataset, e)
+        return None
+    if snapshot.is_stale():
+        log.warning("Snapshot '%s' is older than its CSV; rebuild it with Import_Scripts/build_snapshot.py", dataset)
+        return None
+    return snapshot
+
+
+def to_float(value) -> float:
+    """float32 -> float without the trailing noise (0.1 rather than 0.10000000149011612)."""
+    return float(f"{float(value):.7g}")
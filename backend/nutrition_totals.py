@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date, timedelta
+
+NUTRIENTS = ["calories", "carbohydrate", "fat", "protein"]
+
+
+def _empty_totals():
+    return {"count": 0, **{nutrient: 0.0 for nutrient in NUTRIENTS}}
+
+
+def _totals(counts, nutrition):
+    """Totals for {food: detections}, given {food: nutrition dict or None}."""
+    totals = _empty_totals()
+    for food, count in counts.items():
+        totals["count"] += count
+        for nutrient in NUTRIENTS:
+            totals[nutrient] += count * float((nutrition.get(food) or {}).get(nutrient) or 0)
+    return {key: round(value, 2) if key != "count" else value for key, value in totals.items()}
+
+
+class NutritionTotals:
+    """
+    Running per-day, per-hour and per-food nutrition totals over the food log.
+
+    Each call tails the log from the position it last reached and only counts
+    the new detections per day, hour and food, so reading the totals costs the
+    same no matter how long the log is. Nutrition values are looked up when the
+    totals are read, for the foods in the requested window; `lookup` answers
+    from the nutrition cache, which honours its TTL and import stamps, so the
+    totals follow a re-import. Clearing the log resets the totals. Used from
+    the event loop of the async nutrition API, with an async `lookup`.
+    """
+
+    def __init__(self, food_log, lookup):
+        self.food_log = food_log
+        self.lookup = lookup  # async: food names -> {name: nutrition dict or None}
+        self._lock = asyncio.Lock()
+        self._position = None  # FoodLogStore.tail() position
+        self._days = {}  # "YYYY-MM-DD" -> {"hours": {"HH": {food: count}}, "foods": {food: count}}
+
+    def _reset(self):
+        self._position = None
+        self._days = {}
+
+    async def _refresh(self):
+        # The log is read off the event loop, like /food does
+        entries, position, reset = await asyncio.to_thread(self.food_log.tail, self._position)
+        if reset:
+            self._reset()
+        for entry in entries:
+            timestamp = entry.get("timestamp", "")
+            food = entry["food"]
+            day = self._days.setdefault(timestamp[:10], {"hours": {}, "foods": {}})
+            hour = day["hours"].setdefault(timestamp[11:13], {})
+            hour[food] = hour.get(food, 0) + 1
+            day["foods"][food] = day["foods"].get(food, 0) + 1
+        self._position = position
+
+    async def refresh(self):
+        """Counts entries appended since the last refresh."""
+        async with self._lock:
+            await self._refresh()
+
+    async def summary(self, day=None, days=7):
+        """
+        Totals for one day (default today) broken down by hour and food, plus
+        the daily totals of the `days` days ending on it.
+        """
+        day = day or date.today().isoformat()
+        end = date.fromisoformat(day)
+        window = [(end - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+        async with self._lock:
+            await self._refresh()
+            counts = {d: self._days[d] for d in window if d in self._days}
+            foods = {food for counted in counts.values() for food in counted["foods"]}
+            nutrition = await self.lookup(list(foods)) if foods else {}
+
+            current = counts.get(day)
+            return {
+                "date": day,
+                "totals": _totals(current["foods"], nutrition) if current else _empty_totals(),
+                "hours": {hour: _totals(c, nutrition) for hour, c in sorted(current["hours"].items())} if current else {},
+                "foods": {food: _totals({food: n}, nutrition) for food, n in sorted(current["foods"].items())} if current else {},
+                "days": {d: _totals(counts[d]["foods"], nutrition) if d in counts else _empty_totals() for d in window},
+            }
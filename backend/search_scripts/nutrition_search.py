@@ -1,14 +1,23 @@
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import weaviate
 from weaviate.classes.generate import GenerativeConfig
+from weaviate.classes.query import MetadataQuery
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
-from weviate_connect import weaviate_client
+from weviate_connect import weaviate_client, get_weaviate_client, token_manager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/ for shared modules
+from nutrition_cache import nutrition_cache
+from metrics import ERRORS, WEAVIATE_SECONDS, get_logger, install_flask, span
 
 load_dotenv() #Load Env Keys
 
+log = get_logger("nutrition_search")
+
 google_cloud_project_id = os.environ.get("GOOGLE_PROJECT_ID")
 gemini_api_key = os.environ.get("GEMINI_API_KEY")
 
@@ -20,37 +29,129 @@ if not google_cloud_project_id:
 if not gemini_api_key:
     print("WARNING: GEMINI_API_KEY environment variable not set. ")
 
-assert weaviate_client.is_ready(), "Weaviate connection failed."
+#Define all the collections to search through, e.g. NUTRITION_SEARCH_COLLECTIONS="FoodNutrition,FoodNutrition2"
+collections_to_search = [
+    name.strip() for name in os.environ.get("NUTRITION_SEARCH_COLLECTIONS", "FoodNutrition").split(",") if name.strip()
+]
+
+# "race" retrieves from every collection at once and only generates on the closest hit,
+# "sequential" generates against each collection in order until one answers.
+# With a single collection both modes make the same one generative call.
+search_mode = os.environ.get("NUTRITION_SEARCH_MODE", "race")
+
+race_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nutrition-race")
 
-collections_to_search = ["FoodNutrition"] #Define all the collections to search through
+# "No nutrition information found." is remembered briefly so a burst of misses costs one search
+negative_cache_ttl = float(os.environ.get("NUTRITION_NEGATIVE_CACHE_TTL", "30"))
+
+class NutritionSearchError(Exception):
+    """Nothing was found and at least one collection failed, so the miss may not be genuine."""
 
 def get_nutrition_info(food_item):
     """
     Given a food_item string, search Weaviate and Gemini for nutrition info and return the summary string.
+    Results are cached per normalized food name and concurrent requests for the same food share one
+    search; misses are only cached for negative_cache_ttl seconds so they are retried soon after.
+    A search that failed is not cached at all, so an outage is not served as a miss once it is over.
     """
+    try:
+        summary = nutrition_cache.get_or_load(
+            collections_to_search, food_item, lambda: _search_nutrition_info(food_item),
+            cache_none=False, none_ttl=negative_cache_ttl
+        )
+    except NutritionSearchError as e:
+        log.warning("Nutrition search for '%s' failed: %s", food_item, e)
+        summary = None
+    return summary or "No nutrition information found."
+
+def _search_nutrition_info(food_item):
     query_text = f"Provide nutritional info for {food_item}"
-    summary = None
+    if search_mode == "race" and len(collections_to_search) > 1:
+        return _race_collections(query_text)
+    return _search_sequential(query_text)
+
+def _collection_error(collection_name, e):
+    ERRORS.inc(component="weaviate")
+    if isinstance(e, weaviate.exceptions.WeaviateQueryError):
+        log.warning("Error accessing collection '%s': %s", collection_name, e)
+    else:
+        log.warning("An unexpected error occurred for collection '%s': %s", collection_name, e)
+
+def _generate_summary(collection_name, query_text):
+    collection = get_weaviate_client().collections.get(collection_name)
+    with WEAVIATE_SECONDS.time(operation="generate", collection=collection_name), span("weaviate.generate"):
+        response = collection.generate.near_text(
+            query=query_text,
+            limit=5,
+            grouped_task=f"Based ONLY on the provided food nutrition data, answer the query: '{query_text}'. Be concise and directly provide the requested information. If the exact information is not found, state 'I cannot find that specific information in this particular database.' Do NOT ask follow-up questions.",
+            generative_provider=GenerativeConfig.google()
+        )
+    return response.generated
+
+def _closest_distance(collection_name, query_text):
+    """Cheap retrieval-only probe: distance of the best match in a collection, or None if it is empty."""
+    collection = get_weaviate_client().collections.get(collection_name)
+    with WEAVIATE_SECONDS.time(operation="near_text", collection=collection_name), span("weaviate.near_text"):
+        response = collection.query.near_text(
+            query=query_text,
+            limit=1,
+            return_metadata=MetadataQuery(distance=True)
+        )
+    if response.objects:
+        return response.objects[0].metadata.distance
+    return None
+
+def _race_collections(query_text):
+    """
+    Probes all collections concurrently, then runs the grouped generative task once,
+    on the collection with the closest vector match. Falls back to the next closest
+    collection only if generation fails there.
+    """
+    failed = []
+
+    def probe(collection_name):
+        try:
+            return _closest_distance(collection_name, query_text)
+        except Exception as e:
+            _collection_error(collection_name, e)
+            failed.append(collection_name)
+            return None
+
+    distances = race_executor.map(probe, collections_to_search)
+    ranked = sorted(
+        (distance, name) for name, distance in zip(collections_to_search, distances) if distance is not None
+    )
+    for distance, collection_name in ranked:
+        log.debug("Best match in '%s' (distance %.4f)", collection_name, distance)
+        try:
+            summary = _generate_summary(collection_name, query_text)
+            if summary:
+                return summary
+        except Exception as e:
+            _collection_error(collection_name, e)
+            failed.append(collection_name)
+    if failed:
+        raise NutritionSearchError(f"collections failed: {', '.join(failed)}")
+    return None
+
+def _search_sequential(query_text):
+    failed = []
     for collection_name in collections_to_search:
         try:
-            collection = weaviate_client.collections.get(collection_name)
-            response = collection.generate.near_text(
-                query=query_text,
-                limit=5,
-                grouped_task=f"Based ONLY on the provided food nutrition data, answer the query: '{query_text}'. Be concise and directly provide the requested information. If the exact information is not found, state 'I cannot find that specific information in this particular database.' Do NOT ask follow-up questions.",
-                generative_provider=GenerativeConfig.google()
-            )
-            summary = response.generated
+            summary = _generate_summary(collection_name, query_text)
             if summary:
-                break
-        except weaviate.exceptions.WeaviateQueryError as e:
-            print(f"Error accessing collection '{collection_name}': {e}")
+                return summary
         except Exception as e:
-            print(f"An unexpected error occurred for collection '{collection_name}': {e}")
-    return summary or "No nutrition information found."
+            _collection_error(collection_name, e)
+            failed.append(collection_name)
+    if failed:
+        raise NutritionSearchError(f"collections failed: {', '.join(failed)}")
+    return None
 
 # --- Flask API for nutrition search ---
 app = Flask(__name__)
 CORS(app)
+install_flask(app, "nutrition_search") # /metrics and request timing
 
 @app.route('/api/get-nutrition', methods=['POST'])
 def api_get_nutrition():
@@ -58,12 +159,34 @@ def api_get_nutrition():
     food_item = data.get('food_item')
     if not food_item:
         return jsonify({'status': 'error', 'message': 'No food_item provided'}), 400
-    print(f"[nutrition_search] Received request for: {food_item}")
+    log.info("Received request for: %s", food_item)
     nutrition_data = get_nutrition_info(food_item)
-    print(f"[nutrition_search] Result: {nutrition_data}")
+    log.debug("Result: %s", nutrition_data)
     return jsonify({'status': 'success', 'nutrition_info': nutrition_data})
 
+@app.route('/api/cache-stats', methods=['GET'])
+def api_cache_stats():
+    return jsonify({'status': 'success', 'cache': nutrition_cache.stats()})
+
+@app.route('/api/health', methods=['GET'])
+def api_health():
+    """Liveness: the process is up and answering requests"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/ready', methods=['GET'])
+def api_ready():
+    """Readiness: 200 once the Weaviate connection is open, 503 while it is still being set up"""
+    ready = weaviate_client.ready
+    return jsonify({
+        'status': 'ready' if ready else 'starting',
+        'weaviate': weaviate_client.status(),
+        'vertex_token': token_manager.status()
+    }), 200 if ready else 503
+
 if __name__ == '__main__':
+    # The debug reloader runs the app in a child process; only that one needs a connection
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        weaviate_client.warm_up()
     print("Nutrition Search API starting on http://localhost:5001")
     app.run(debug=True, host='0.0.0.0', port=5001)
 
@@ -1,14 +1,25 @@
 import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
 import weaviate
 from weaviate.classes.generate import GenerativeConfig
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 
-from weviate_connect import weaviate_client
+from weviate_connect import weaviate_client, get_weaviate_client, token_manager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/ for shared modules
+from nutrition_cache import normalize_food_name
+from single_flight import SingleFlight
+from metrics import ERRORS, SERIALIZE_SECONDS, WEAVIATE_SECONDS, get_logger, install_flask, span
 
 load_dotenv() #Load Env Keys
 
+log = get_logger("search")
+
 google_cloud_project_id = os.environ.get("GOOGLE_PROJECT_ID")
 gemini_api_key = os.environ.get("GEMINI_API_KEY")
 
@@ -20,47 +31,101 @@ if not google_cloud_project_id:
 if not gemini_api_key:
     print("WARNING: GEMINI_API_KEY environment variable not set. ")
 
-assert weaviate_client.is_ready(), "Weaviate connection failed."
-
 collections_to_search = ["FoodNutrition", "FoodNutrition2", "FoodNutrition3", "FoodNutrition4"] #Define all the collections to search through
 
-def search_collections(query_text):
-    summaries = []
-    for collection_name in collections_to_search:
-        print(f"\n--- Searching in collection: {collection_name} ---")
-        try:
-            collection = weaviate_client.collections.get(collection_name)
+collection_timeouts = {} # Optional per-collection overrides, in seconds
+default_collection_timeout = float(os.environ.get("SEARCH_COLLECTION_TIMEOUT", "30"))
+queued_poll_interval = 0.05 # seconds between checks for queued searches that have started
+
+# Shared across requests so concurrent searches can't spawn unbounded threads
+search_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("SEARCH_MAX_WORKERS", "8")),
+    thread_name_prefix="search"
+)
+
+def search_collection(collection_name, query_text):
+    """Runs the generative search against one collection and returns its summary entry."""
+    log.debug("Searching in collection: %s", collection_name)
+    try:
+        collection = get_weaviate_client().collections.get(collection_name)
+        with WEAVIATE_SECONDS.time(operation="generate", collection=collection_name), span("weaviate.generate"):
             response = collection.generate.near_text(
                 query=query_text,
                 limit=5,
                 grouped_task=f"Based ONLY on the provided food nutrition data, answer the query: '{query_text}'. Be concise and directly provide the requested information. If the exact information is not found, state 'I cannot find that specific information in this particular database.' Do NOT ask follow-up questions.",
                 generative_provider=GenerativeConfig.google()
             )
-            summary = response.generated
-            print(f"\nGenerated summary from {collection_name}:\n{summary}")
-            summaries.append({
-                'collection': collection_name,
-                'summary': summary
-            })
-        except weaviate.exceptions.WeaviateQueryError as e:
-            error_message = f"Error accessing collection '{collection_name}': {e}"
-            print(error_message)
-            summaries.append({
-                'collection': collection_name,
-                'summary': error_message
-            })
-        except Exception as e:
-            error_message = f"An unexpected error occurred for collection '{collection_name}': {e}"
-            print(error_message)
-            summaries.append({
-                'collection': collection_name,
-                'summary': error_message
-            })
-    return summaries
+        summary = response.generated
+        log.debug("Generated summary from %s:\n%s", collection_name, summary)
+        return {
+            'collection': collection_name,
+            'summary': summary
+        }
+    except weaviate.exceptions.WeaviateQueryError as e:
+        error_message = f"Error accessing collection '{collection_name}': {e}"
+    except Exception as e:
+        error_message = f"An unexpected error occurred for collection '{collection_name}': {e}"
+    ERRORS.inc(component="weaviate")
+    log.warning(error_message)
+    return {
+        'collection': collection_name,
+        'summary': error_message
+    }
+
+def iter_collection_summaries(query_text):
+    """
+    Queries every collection concurrently and yields each summary entry as soon as it completes.
+    A collection that exceeds its timeout yields an error entry instead of holding up the rest.
+    The timeout runs from when a worker picks the search up, so time spent queued behind other
+    requests doesn't count against it.
+    """
+    started_at = {} # collection -> when its search started running
+
+    def run(collection_name):
+        started_at[collection_name] = time.monotonic()
+        return search_collection(collection_name, query_text)
+
+    pending = {search_executor.submit(run, name): name for name in collections_to_search}
+
+    while pending:
+        deadlines = [
+            started_at[name] + collection_timeouts.get(name, default_collection_timeout)
+            for name in pending.values() if name in started_at
+        ]
+        timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        if len(deadlines) < len(pending):
+            # Some searches are still queued; look again soon to start their clocks
+            timeout = queued_poll_interval if timeout is None else min(timeout, queued_poll_interval)
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.pop(future)
+            yield future.result()
+
+        now = time.monotonic()
+        for future, collection_name in list(pending.items()):
+            started = started_at.get(collection_name)
+            timeout = collection_timeouts.get(collection_name, default_collection_timeout)
+            if started is not None and started + timeout <= now and not future.done():
+                # The call keeps its worker until the client's query timeout (WEAVIATE_QUERY_TIMEOUT) ends it
+                pending.pop(future)
+                error_message = f"Timed out searching collection '{collection_name}'"
+                ERRORS.inc(component="weaviate")
+                log.warning(error_message)
+                yield {
+                    'collection': collection_name,
+                    'summary': error_message
+                }
+
+# Identical queries that arrive while one is running share its summaries
+search_flights = SingleFlight()
+
+def search_collections(query_text):
+    return search_flights.do(normalize_food_name(query_text), lambda: list(iter_collection_summaries(query_text)))
 
 # --- Flask API for search ---
 app = Flask(__name__)
 CORS(app)
+install_flask(app, "search") # /metrics and request timing
 
 @app.route('/api/search', methods=['POST'])
 def api_search():
@@ -68,11 +133,46 @@ def api_search():
     query = data.get('query')
     if not query:
         return jsonify({'status': 'error', 'message': 'No query provided'}), 400
-    print(f"[search] Received query: {query}")
+    log.info("Received query: %s", query)
     summaries = search_collections(query)
-    print(f"[search] Summaries: {summaries}")
+    log.debug("Summaries: %s", summaries)
     return jsonify({'status': 'success', 'summaries': summaries})
 
+@app.route('/api/search/stream', methods=['POST'])
+def api_search_stream():
+    """Streams one JSON line per collection, in completion order."""
+    data = request.get_json()
+    query = data.get('query')
+    if not query:
+        return jsonify({'status': 'error', 'message': 'No query provided'}), 400
+    log.info("Received streaming query: %s", query)
+
+    def generate():
+        for summary in iter_collection_summaries(query):
+            with SERIALIZE_SECONDS.time(endpoint="/api/search/stream"):
+                line = json.dumps(summary) + "\n"
+            yield line
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/health', methods=['GET'])
+def api_health():
+    """Liveness: the process is up and answering requests"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/api/ready', methods=['GET'])
+def api_ready():
+    """Readiness: 200 once the Weaviate connection is open, 503 while it is still being set up"""
+    ready = weaviate_client.ready
+    return jsonify({
+        'status': 'ready' if ready else 'starting',
+        'weaviate': weaviate_client.status(),
+        'vertex_token': token_manager.status()
+    }), 200 if ready else 503
+
 if __name__ == '__main__':
+    # The debug reloader runs the app in a child process; only that one needs a connection
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        weaviate_client.warm_up()
     print("Search API starting on http://localhost:5002")
     app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
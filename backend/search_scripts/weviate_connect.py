@@ -1,21 +1,41 @@
 import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 import weaviate
-from weaviate.classes.init import Auth
+from weaviate.classes.init import AdditionalConfig, Auth, Timeout
 
 # Import Google authentication libraries
 from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # backend/ for shared modules
+from lazy_resource import LazyResource
+from metrics import Gauge, get_logger
+from local_weaviate import connect_local, local_mode
+
 # Load environment variables from .env file
 # This ensures environment variables are available when this module is imported
 load_dotenv()
 
+log = get_logger("weviate_connect")
+
+VERTEX_HEADER = "X-Goog-Vertex-Api-Key"
+
+# Refresh this many seconds before the token expires, and retry this often after a failed refresh
+TOKEN_REFRESH_MARGIN = float(os.environ.get("VERTEX_TOKEN_REFRESH_MARGIN", "300"))
+TOKEN_RETRY_INTERVAL = float(os.environ.get("VERTEX_TOKEN_RETRY_INTERVAL", "30"))
+
+# Upper bound on a single query or generative call, so a hung request can't hold a worker thread forever
+WEAVIATE_QUERY_TIMEOUT = float(os.environ.get("WEAVIATE_QUERY_TIMEOUT", "30"))
+
 # --- Google Vertex AI Authentication Setup ---
 
-def get_google_credentials() -> Credentials:
+def load_google_credentials() -> Credentials:
     """
-    Loads Google service account credentials and refreshes the access token.
+    Loads the Google service account credentials without fetching a token.
     This function expects the GOOGLE_APPLICATION_CREDENTIALS environment variable
     to be set to the path of your service account JSON key file.
     """
@@ -27,48 +47,189 @@ def get_google_credentials() -> Credentials:
         )
 
     # Initialize credentials from the service account file
-    credentials = Credentials.from_service_account_file(
+    return Credentials.from_service_account_file(
         service_account_path,
         scopes=[
             "https://www.googleapis.com/auth/generative-language",
             "https://www.googleapis.com/auth/cloud-platform",
         ],
     )
-    
+
+def get_google_credentials() -> Credentials:
+    """Loads the Google service account credentials and fetches an access token."""
+    credentials = load_google_credentials()
     # Refresh the token. This makes an API call to Google to get a new access token
     # if the current one is expired or close to expiring.
-    request = Request()
-    credentials.refresh(request)
+    credentials.refresh(Request())
     return credentials
 
+def rotate_client_header(client: weaviate.WeaviateClient, name: str, value: str):
+    """
+    Replaces a header on a live client. REST requests read the headers on every
+    call and gRPC metadata is rebuilt once, so queries already in flight keep
+    the value they were sent with and the connection is never torn down.
+    Relies on weaviate-client internals (tested with the version pinned in
+    requirements.txt); raises AttributeError if they have changed.
+    """
+    connection = client._connection
+    connection.additional_headers[name] = value
+    connection._headers[name.lower()] = value
+    connection._prepare_grpc_headers()
+
+class VertexTokenManager:
+    """
+    Keeps the Vertex AI access token fresh for long-running services.
+
+    A daemon thread refreshes the token TOKEN_REFRESH_MARGIN seconds before it
+    expires (retrying every TOKEN_RETRY_INTERVAL seconds on failure) and
+    rotates the new token into every attached client, so requests never wait
+    on a re-auth. A client the token can't be rotated into is handed to its
+    on_stale callback to be rebuilt instead. status() reports the token age
+    and refresh latency.
+    """
+
+    def __init__(self, refresh_margin=TOKEN_REFRESH_MARGIN, retry_interval=TOKEN_RETRY_INTERVAL):
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._credentials = None
+        self._clients = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.refreshed_at = None
+        self.last_refresh_ms = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+
+    @property
+    def token(self) -> str:
+        if self._credentials is None or not self._credentials.token:
+            self.refresh()
+        return self._credentials.token
+
+    def refresh(self):
+        stale = []
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = load_google_credentials()
+            started = time.perf_counter()
+            try:
+                self._credentials.refresh(Request())
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.refreshed_at = time.time()
+            self.refreshes += 1
+            self.last_error = None
+            token = self._credentials.token
+            for client, on_stale in list(self._clients):
+                try:
+                    rotate_client_header(client, VERTEX_HEADER, token)
+                except AttributeError as e:
+                    log.warning("Could not rotate the Vertex token into the client (%s); rebuilding it", e)
+                    self._clients.remove((client, on_stale))
+                    if on_stale is not None:
+                        stale.append((client, on_stale))
+        log.info("Vertex token refreshed in %s ms", self.last_refresh_ms)
+        # Rebuilding goes through other locks (and attach() takes ours), so it runs after releasing it
+        for client, on_stale in stale:
+            on_stale(client)
+
+    def attach(self, client: weaviate.WeaviateClient, on_stale=None):
+        """
+        Keeps client's Vertex header up to date and starts the refresher.
+        on_stale(client) is called if a new token can't be rotated into it.
+        """
+        with self._lock:
+            self._clients.append((client, on_stale))
+        self.start()
+
+    def seconds_until_expiry(self):
+        expiry = self._credentials.expiry if self._credentials else None
+        if expiry is None:
+            return None
+        # google-auth reports expiry as a naive UTC datetime
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        return (expiry - datetime.now(timezone.utc)).total_seconds()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="vertex-token-refresh", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            remaining = self.seconds_until_expiry()
+            delay = self.retry_interval if remaining is None else max(remaining - self.refresh_margin, 0)
+            time.sleep(delay)
+            try:
+                self.refresh()
+            except Exception as e:
+                log.warning("Vertex token refresh failed, retrying in %ss: %s", self.retry_interval, e)
+                time.sleep(self.retry_interval)
+
+    def status(self):
+        remaining = self.seconds_until_expiry()
+        return {
+            "token_age_seconds": round(time.time() - self.refreshed_at, 1) if self.refreshed_at else None,
+            "expires_in_seconds": round(remaining, 1) if remaining is not None else None,
+            "last_refresh_ms": self.last_refresh_ms,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+token_manager = VertexTokenManager()
+
+# Exported on /metrics; no sample until the first refresh
+VERTEX_TOKEN_AGE = Gauge("nutriscan_vertex_token_age_seconds", "Seconds since the Vertex AI token was refreshed",
+                         lambda: token_manager.status()["token_age_seconds"])
+VERTEX_REFRESH_SECONDS = Gauge("nutriscan_vertex_token_refresh_seconds", "Duration of the last Vertex AI token refresh",
+                               lambda: token_manager.status()["last_refresh_ms"] / 1000)
+
 def re_instantiate_weaviate_client() -> weaviate.WeaviateClient:
     """
-    Re-instantiates the Weaviate client with a fresh Vertex AI access token.
-    This function should be called periodically in long-running applications
-    to ensure the Vertex AI token remains valid. For a single-run script,
-    calling it once at the start is sufficient.
+    Creates the Weaviate client with the current Vertex AI access token and
+    hands it to token_manager, which rotates fresh tokens into it from then on,
+    so the client never needs to be rebuilt for a new token.
+    With WEAVIATE_BACKEND=local it returns the in-process stand-in instead.
     """
+    if local_mode():
+        return connect_local()
+
     # Retrieve Weaviate URL and API key from environment variables
     weaviate_url = os.environ["WEAVIATE_URL"]
     weaviate_api_key = os.environ["WEAVIATE_API_KEY"]
 
-    # Get the refreshed Google credentials and extract the access token
-    credentials = get_google_credentials()
-    vertex_ai_token = credentials.token
-
     # Set the X-Goog-Vertex-Api-Key header with the dynamically obtained token
     headers = {
-        "X-Goog-Vertex-Api-Key": vertex_ai_token,
+        VERTEX_HEADER: token_manager.token,
     }
 
     # Connect to Weaviate Cloud with the updated headers
     client = weaviate.connect_to_weaviate_cloud(
         cluster_url=weaviate_url,
         auth_credentials=Auth.api_key(weaviate_api_key),
-        headers=headers
+        headers=headers,
+        additional_config=AdditionalConfig(timeout=Timeout(query=WEAVIATE_QUERY_TIMEOUT))
     )
+    token_manager.attach(client, on_stale=_rebuild_weaviate_client)
     return client
 
-# Instantiate the Weaviate client directly when this module is imported
-weaviate_client = re_instantiate_weaviate_client()
+def _rebuild_weaviate_client(stale_client: weaviate.WeaviateClient):
+    """The next get() connects a new client with the fresh token."""
+    weaviate_client.reset()
+    # Requests still holding the stale client can finish before its token expires
+    closer = threading.Timer(token_manager.refresh_margin, stale_client.close)
+    closer.daemon = True
+    closer.start()
+
+# Connected on first use (or by warm_up()), not when this module is imported
+weaviate_client = LazyResource("weaviate", re_instantiate_weaviate_client)
 
+def get_weaviate_client() -> weaviate.WeaviateClient:
+    return weaviate_client.get()
@@ -1,41 +1,215 @@
-import weaviate
-from weaviate.classes.init import Auth
+import asyncio
 import os
+import time
+import weaviate
+from weaviate.classes.init import Auth, AdditionalConfig, Timeout
+from weaviate.config import ConnectionConfig
 from dotenv import load_dotenv
+from nutrition_cache import nutrition_cache
+from local_nutrition import get_local_engine
+from local_weaviate import local_mode, use_async_local
+from metrics import ERRORS, WEAVIATE_SECONDS, get_logger, span
 
 load_dotenv()
 
+log = get_logger("weaviate_client")
+
 WEAVIATE_URL = os.getenv("WEAVIATE_URL")
 WEAVIATE_KEY = os.getenv("WEAVIATE_API_KEY") 
 
-client = weaviate.connect_to_weaviate_cloud(
-    cluster_url=WEAVIATE_URL,
-    auth_credentials=Auth.api_key(WEAVIATE_KEY),
+NUTRITION_COLLECTION = "FoodNutrition"
+LOCAL_NUTRITION_ENABLED = os.getenv("LOCAL_NUTRITION_ENABLED", "1") != "0"
+
+# Connection pool shared by every request; idle connections are kept alive between requests
+POOL_CONNECTIONS = int(os.getenv("WEAVIATE_POOL_CONNECTIONS", "20"))
+POOL_MAXSIZE = int(os.getenv("WEAVIATE_POOL_MAXSIZE", "100"))
+QUERY_TIMEOUT = float(os.getenv("WEAVIATE_QUERY_TIMEOUT", "30"))
+HEALTH_CHECK_INTERVAL = float(os.getenv("WEAVIATE_HEALTH_CHECK_INTERVAL", "30"))
+MAX_CONCURRENT_LOOKUPS = int(os.getenv("NUTRITION_MAX_CONCURRENT_LOOKUPS", "16"))
+
+# Errors after which the connection is rebuilt and the call retried once
+CONNECTION_ERRORS = (
+    weaviate.exceptions.WeaviateConnectionError,
+    weaviate.exceptions.WeaviateClosedClientError,
+    weaviate.exceptions.WeaviateGRPCUnavailableError,
 )
 
-# sample_food = 'banana'
 
-def create_weaviate_client():
-    return client
+class WeaviateConnection:
+    """
+    Owns the async Weaviate client of the nutrition API: opened and closed by
+    the FastAPI lifespan, pinged in the background every
+    HEALTH_CHECK_INTERVAL seconds, and rebuilt when a ping or a query fails
+    with a connection error.
+    """
+
+    def __init__(self, url=WEAVIATE_URL, api_key=WEAVIATE_KEY, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.url = url
+        self.api_key = api_key
+        self.health_check_interval = health_check_interval
+        self.client = None
+        self.healthy = False
+        self.last_check = None
+        self.reconnects = 0
+        self._reconnect_lock = asyncio.Lock()
+        self._health_task = None
+
+    def _create_client(self):
+        if local_mode():
+            return use_async_local() # in-process stand-in, see local_weaviate.py
+        return weaviate.use_async_with_weaviate_cloud(
+            cluster_url=self.url,
+            auth_credentials=Auth.api_key(self.api_key),
+            additional_config=AdditionalConfig(
+                connection=ConnectionConfig(
+                    session_pool_connections=POOL_CONNECTIONS,
+                    session_pool_maxsize=POOL_MAXSIZE,
+                ),
+                timeout=Timeout(query=QUERY_TIMEOUT),
+            ),
+        )
+
+    async def start(self):
+        self.client = self._create_client()
+        await self.client.connect()
+        await self.check_health()
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+        self.healthy = False
+
+    async def check_health(self):
+        try:
+            self.healthy = bool(await self.client.is_ready())
+        except Exception as e:
+            log.warning("Health check failed: %s", e)
+            self.healthy = False
+        self.last_check = time.time()
+        return self.healthy
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            if not await self.check_health():
+                try:
+                    await self.reconnect(self.client)
+                except Exception as e:
+                    ERRORS.inc(component="weaviate")
+                    log.error("Reconnect failed: %s", e)
+
+    async def reconnect(self, failed_client):
+        """Replaces failed_client; concurrent callers that saw the same failure reconnect once."""
+        async with self._reconnect_lock:
+            if self.client is not failed_client:
+                return
+            log.info("Reconnecting to Weaviate")
+            try:
+                await failed_client.close()
+            except Exception:
+                pass
+            client = self._create_client()
+            await client.connect()
+            self.client = client
+            self.reconnects += 1
+            await self.check_health()
+
+    async def run(self, operation):
+        """Awaits operation(client), reconnecting and retrying once on a connection error."""
+        client = self.client
+        try:
+            return await operation(client)
+        except CONNECTION_ERRORS as e:
+            ERRORS.inc(component="weaviate")
+            log.warning("Connection error, retrying on a new connection: %s", e)
+            await self.reconnect(client)
+            return await operation(self.client)
 
-def get_nutrition_info(food_name: str):
-    nutrition = client.collections.get("FoodNutrition")
+    def status(self):
+        return {
+            "connected": self.client is not None,
+            "healthy": self.healthy,
+            "last_check": self.last_check,
+            "reconnects": self.reconnects,
+        }
 
-    response = nutrition.query.near_text(query=food_name,limit=1,return_properties=["name", "calories", "carbohydrate", "fat", "protein"])
+
+# Set by the FastAPI lifespan in main.py
+connection = None
+_in_flight = {} # cache key -> Task shared by concurrent lookups of the same food
+
+
+def set_connection(weaviate_connection):
+    global connection
+    connection = weaviate_connection
+
+
+async def get_nutrition_info(food_name: str):
+    found, value = nutrition_cache.get(NUTRITION_COLLECTION, food_name)
+    if found:
+        return value
+
+    # Concurrent requests for the same food await a single lookup task. A caller that is
+    # cancelled only stops waiting; the task carries on for the others and fills the cache.
+    key = nutrition_cache.make_key(NUTRITION_COLLECTION, food_name)
+    task = _in_flight.get(key)
+    if task is None:
+        task = _in_flight[key] = asyncio.create_task(_load_nutrition_info(food_name, key))
+        task.add_done_callback(_retrieve_exception)
+    return await asyncio.shield(task)
+
+async def _load_nutrition_info(food_name: str, key):
+    try:
+        value = await _query_nutrition_info(food_name)
+        nutrition_cache.set(NUTRITION_COLLECTION, food_name, value)
+        return value
+    finally:
+        del _in_flight[key]
+
+def _retrieve_exception(task):
+    # A failure nobody is left waiting for is not logged as "never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+async def _query_nutrition_info(food_name: str):
+    # Answer from the local CSV data when it has a confident match
+    if LOCAL_NUTRITION_ENABLED:
+        result = get_local_engine().get_nutrition_info(food_name)
+        if result is not None:
+            return result
+
+    async def query(client):
+        nutrition = client.collections.get(NUTRITION_COLLECTION)
+        with WEAVIATE_SECONDS.time(operation="near_text", collection=NUTRITION_COLLECTION), span("weaviate.near_text"):
+            return await nutrition.query.near_text(query=food_name,limit=1,return_properties=["name", "calories", "carbohydrate", "fat", "protein"])
+
+    response = await connection.run(query)
 
     if response.objects:
         result = response.objects[0].properties
         return dict(result)
     return None
 
-# def close_database():
-#     client.close()
-
-
-# print(get_nutrition_info(sample_food))
+async def get_nutrition_infos(food_names, max_concurrency=MAX_CONCURRENT_LOOKUPS):
+    """
+    Looks up several foods at once. Each distinct name is queried only once and
+    the lookups run concurrently on the event loop; the returned dict maps every
+    name to its result (or None).
+    """
+    unique_names = list(dict.fromkeys(food_names))
+    if not unique_names:
+        return {}
 
-# for obj in response.objects:
-#     print(json.dumps(obj.properties, indent=2))
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    
+    async def lookup(name):
+        async with semaphore:
+            return await get_nutrition_info(name)
 
+    results = await asyncio.gather(*(lookup(name) for name in unique_names))
+    return dict(zip(unique_names, results))